@@ -0,0 +1,323 @@
+import os
+import math
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .moderator import BotProcess, play_game
+from .openings import OPENINGS_FEN_CSV, load_openings
+from .profiling import ProfileLog
+
+
+# Plays two bots against each other over an opening suite with
+# color-swapped pairs and stops early with a sequential probability
+# ratio test (SPRT). Each pair plays the same opening twice, once with
+# each bot as White, so the opening's own bias cancels out.
+
+
+# A pair scores 0, 0.25, 0.5, 0.75 or 1 (pentanomial model). Each outcome
+# starts with this many pseudo-pairs, so the score variance is never 0
+# and a handful of identical pairs cannot decide the test or give a
+# zero-width Elo interval; the prior washes out as real pairs come in.
+PAIR_SCORES = (0.0, 0.25, 0.5, 0.75, 1.0)
+PRIOR_PAIRS = 0.25
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_from_score(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class SPRT:
+    """
+    Sequential probability ratio test on game pairs, using the normal
+    approximation to the log-likelihood ratio (GSPRT).
+
+    H0: Elo difference is elo0, H1: Elo difference is elo1.
+    """
+
+    def __init__(self, elo0: float = 0.0, elo1: float = 10.0,
+                 alpha: float = 0.05, beta: float = 0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.pairs = []  # score of bot A in each pair, 0 to 1 in steps of 0.25
+
+    def add_pair(self, score: float):
+        self.pairs.append(score)
+
+    def stats(self):
+        """Number of pairs, and mean and variance of the pair score with the prior."""
+        counts = [PRIOR_PAIRS + self.pairs.count(score) for score in PAIR_SCORES]
+        total = sum(counts)
+        mean = sum(c * score for c, score in zip(counts, PAIR_SCORES)) / total
+        var = sum(c * (score - mean) ** 2 for c, score in zip(counts, PAIR_SCORES)) / total
+        return len(self.pairs), mean, var
+
+    def llr(self) -> float:
+        if not self.pairs:
+            return 0.0
+        n, mean, var = self.stats()
+        s0 = expected_score(self.elo0)
+        s1 = expected_score(self.elo1)
+        return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+    def status(self) -> str:
+        llr = self.llr()
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return ""
+
+    def elo(self):
+        """Elo difference of bot A over bot B with a 95% confidence interval."""
+        n, mean, var = self.stats()
+        margin = 1.96 * math.sqrt(var / n)
+        return (elo_from_score(mean),
+                elo_from_score(mean - margin),
+                elo_from_score(mean + margin))
+
+
+class BotPool:
+    """
+    Keeps bot processes alive between games, one per bot per worker
+    thread, and starts each new game with the new game command instead of
+    spawning fresh interpreters. Bots that timed out or died are replaced.
+    """
+
+    def __init__(self, time_limit: float):
+        self.time_limit = time_limit
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.processes = []
+
+    def get(self, key: str, path: str, color: str, opening: tuple) -> BotProcess:
+        fen, moves = opening
+        bots = getattr(self.local, "bots", None)
+        if bots is None:
+            bots = self.local.bots = {}
+
+        bot = bots.get(key)
+        if bot is not None and bot.reusable and bot.process.poll() is None:
+            bot.new_game(color, fen, moves)
+            return bot
+        if bot is not None:
+            bot.close()
+
+        bot = BotProcess(path, color, fen=fen, moves=moves, time_limit=self.time_limit, verbose=False)
+        bots[key] = bot
+        with self.lock:
+            self.processes.append(bot)
+        return bot
+
+    def close(self):
+        for bot in self.processes:
+            bot.close()
+
+
+class ActiveGames:
+    """
+    Bot processes of the games being played. Once the match is decided
+    (or interrupted) stop() kills them, so running games end at once
+    instead of being played out, and no new game starts.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bots = set()
+        self.stopped = False
+
+    def add(self, *bots: BotProcess) -> bool:
+        """Registers a game's bots. False if the match was already stopped."""
+        with self.lock:
+            if self.stopped:
+                return False
+            self.bots.update(bots)
+            return True
+
+    def remove(self, *bots: BotProcess):
+        with self.lock:
+            self.bots.difference_update(bots)
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            bots = list(self.bots)
+        for bot in bots:
+            bot.close()
+
+
+def play_match_game(white: tuple, black: tuple, opening: tuple, time_limit: float,
+                    pool: BotPool = None, profile_log: ProfileLog = None,
+                    active: ActiveGames = None) -> float:
+    """
+    Plays one game between (key, path) bots and returns White's score
+    (1, 0.5 or 0). With a pool, bot processes are reused across games.
+    With a profile log, the game's moderator timings are recorded in it.
+    Returns None if active was stopped before or during the game.
+    """
+    fen, moves = opening
+    if pool is not None:
+        White_bot = pool.get(white[0], white[1], "w", opening)
+        Black_bot = pool.get(black[0], black[1], "b", opening)
+    else:
+        White_bot = BotProcess(white[1], "w", fen=fen, moves=moves, time_limit=time_limit, verbose=False)
+        Black_bot = BotProcess(black[1], "b", fen=fen, moves=moves, time_limit=time_limit, verbose=False)
+    if active is not None and not active.add(White_bot, Black_bot):
+        White_bot.close()
+        Black_bot.close()
+        return None
+    try:
+        if profile_log is not None:
+            winner = profile_log.run(play_game, White_bot, Black_bot, fen=fen, moves=moves, verbose=False)
+        else:
+            winner = play_game(White_bot, Black_bot, fen=fen, moves=moves, verbose=False)
+    finally:
+        if active is not None:
+            active.remove(White_bot, Black_bot)
+        if pool is None:
+            White_bot.close()
+            Black_bot.close()
+
+    if active is not None and active.stopped:
+        return None
+    if winner[0] == "d":
+        return 0.5
+    return 1.0 if winner == "w" else 0.0
+
+
+def play_pair(bot_a: str, bot_b: str, opening: tuple, time_limit: float, pool: BotPool = None,
+              profile_log: ProfileLog = None, active: ActiveGames = None):
+    """
+    Plays an opening twice with colors swapped. Returns bot A's game
+    scores, or None if the match was stopped first.
+    """
+    a, b = ("a", bot_a), ("b", bot_b)
+    first = play_match_game(a, b, opening, time_limit, pool, profile_log, active)
+    if first is None:
+        return None
+    second = play_match_game(b, a, opening, time_limit, pool, profile_log, active)
+    if second is None:
+        return None
+    return first, 1.0 - second
+
+
+def run_match(bot_a: str, bot_b: str, max_pairs: int = 200, concurrency: int = 4,
+              time_limit: float = 60.0, sprt: SPRT = None, openings: list = None,
+              seed: int = None, reuse: bool = False, profile_log: ProfileLog = None) -> SPRT:
+    """
+    Plays up to max_pairs color-swapped pairs of bot_a against bot_b,
+    concurrency pairs at a time, stopping as soon as the SPRT decides.
+    With reuse, bot processes are kept alive between games (both bots
+    must support the new game command). With a profile log, every game's
+    moderator timings are recorded in it.
+    """
+    sprt = sprt or SPRT()
+    openings = openings or load_openings()
+    rng = random.Random(seed)
+    suite = rng.sample(openings, min(max_pairs, len(openings)))
+
+    pool = BotPool(time_limit) if reuse else None
+    active = ActiveGames()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    wins = draws = losses = 0
+    pending = set()
+    next_opening = 0
+
+    def submit():
+        nonlocal next_opening
+        opening = suite[next_opening]
+        next_opening += 1
+        pending.add(executor.submit(play_pair, bot_a, bot_b, opening, time_limit, pool,
+                                     profile_log, active))
+
+    try:
+        while next_opening < len(suite) and len(pending) < concurrency:
+            submit()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                scores = future.result()
+                for score in scores:
+                    wins += score == 1.0
+                    draws += score == 0.5
+                    losses += score == 0.0
+                sprt.add_pair(sum(scores) / 2)
+
+                elo, low, high = sprt.elo()
+                print(f"Pairs {len(sprt.pairs)}: +{wins} ={draws} -{losses}  "
+                      f"Elo {elo:+.1f} [{low:+.1f}, {high:+.1f}]  "
+                      f"LLR {sprt.llr():.2f} ({sprt.lower:.2f}, {sprt.upper:.2f})")
+
+            if sprt.status():
+                break
+            while next_opening < len(suite) and len(pending) < concurrency:
+                submit()
+    finally:
+        # Pairs still running are not needed (or the match was interrupted):
+        # kill their bots rather than waiting for the games to finish
+        active.stop()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if pool is not None:
+            pool.close()
+    return sprt
+
+
+def main(argv: list):
+    parser = argparse.ArgumentParser(prog="python -m competition_moderator match",
+                                     description="Play two bots against each other with SPRT early stopping.")
+    parser.add_argument("bot_a", help="path to the bot under test")
+    parser.add_argument("bot_b", help="path to the baseline bot")
+    parser.add_argument("--pairs", type=int, default=200, help="maximum number of game pairs")
+    parser.add_argument("--concurrency", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="game pairs played at once (each uses two bot processes)")
+    parser.add_argument("--time", type=float, default=60.0, help="seconds per side per game")
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=10.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--openings", default=OPENINGS_FEN_CSV,
+                        help="csv with a fen column (openings_fen7.csv) or a moves_list column (openings.csv)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--reuse", action="store_true",
+                        help="keep bot processes alive between games (bots must support the newgame command)")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="append each game's moderator timings to FILE as JSON lines and print a summary")
+    parser.add_argument("--cprofile", default=None, metavar="DIR",
+                        help="write a cProfile dump of every game into DIR (plays one pair at a time)")
+    args = parser.parse_args(argv)
+
+    if args.cprofile and args.concurrency > 1:
+        # Only one cProfile profiler can run per process (Python 3.12+)
+        print("--cprofile: playing one pair at a time")
+        args.concurrency = 1
+
+    profile_log = None
+    if args.profile or args.cprofile:
+        profile_log = ProfileLog(args.profile, args.cprofile)
+
+    sprt = run_match(args.bot_a, args.bot_b, max_pairs=args.pairs, concurrency=args.concurrency,
+                     time_limit=args.time,
+                     sprt=SPRT(args.elo0, args.elo1, args.alpha, args.beta),
+                     openings=load_openings(args.openings), seed=args.seed, reuse=args.reuse,
+                     profile_log=profile_log)
+
+    if not sprt.pairs:
+        print("No games played.")
+        return
+    elo, low, high = sprt.elo()
+    verdict = {"H1": f"H1 accepted: {args.bot_a} is at least {args.elo1:+g} Elo",
+               "H0": f"H0 accepted: {args.bot_a} is not better than {args.elo0:+g} Elo",
+               "": "Inconclusive: pair limit reached"}[sprt.status()]
+    print(f"\nElo difference: {elo:+.1f} (95% CI {low:+.1f} to {high:+.1f}) over {2 * len(sprt.pairs)} games")
+    print(verdict)
+    if profile_log is not None:
+        print("\n" + profile_log.summary())
@@ -0,0 +1,285 @@
+import subprocess
+import time
+import select
+import os
+import fcntl
+import chess
+from typing import List, Optional
+from .profiling import GameProfile
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+TIME_LIMIT = 300.0  # 5 minutes in seconds
+
+
+class BotProcess:
+    def __init__(self, module_path: str, color: str, fen: Optional[str] = None,
+                 moves: Optional[List[str]] = None,
+                 time_limit: float = TIME_LIMIT, verbose: bool = True):
+        self.path = module_path
+        self.color = color
+        self.verbose = verbose
+
+        # if not module_path.exists(): # This requires pathlib, commenting out
+        #     raise FileNotFoundError(f"Bot module not found: {module_path}")
+        
+        self.log(f"Starting {color} bot: {module_path}")
+        
+        # --- FIX: Split the path to set PYTHONPATH and find the module name ---
+        # User provides 'ai-chess-bot/demo-bot'
+        # 1. The search path (to add to PYTHONPATH) is 'ai-chess-bot'
+        # 2. The module name (to run with -m) is 'demo-bot'
+        
+        # os.path.normpath handles trailing slashes
+        norm_path = os.path.normpath(module_path) 
+        search_path = os.path.dirname(norm_path)
+        module_name = os.path.basename(norm_path)
+
+        # Ensure module names are valid Python identifiers (replace - with _)
+        module_name = module_name.replace('-', '_')
+
+        # Get the absolute path for the search directory
+        abs_search_path = os.path.abspath(search_path)
+        
+        self.log(f"  - Module name: {module_name}")
+        self.log(f"  - Adding to PYTHONPATH: {abs_search_path}")
+
+        # Create a new environment for the subprocess
+        # This inherits the current environment
+        bot_env = os.environ.copy()
+        
+        # Prepend our new search path to the PYTHONPATH
+        # This ensures our module is found first
+        current_pythonpath = bot_env.get('PYTHONPATH', '')
+        new_pythonpath = f"{abs_search_path}{os.pathsep}{current_pythonpath}"
+        bot_env['PYTHONPATH'] = new_pythonpath
+        
+        # Added '-u' for unbuffered I/O, which is crucial for subprocess comms
+        command = ['python', '-u', '-m', module_name, 'play', color]
+        if fen is not None or moves:
+            # Optional start position and opening moves (see bot_spec.md)
+            command.append(fen or STARTING_FEN)
+            command.extend(moves or [])
+
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,  # Line buffered
+            env=bot_env # --- Pass the modified environment ---
+        )
+
+        # Set stderr to non-blocking so we can read from it without hanging
+        try:
+            fd = self.process.stderr.fileno()
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        except Exception as e:
+            self.log(f"Warning: Could not set stderr to non-blocking (OS may not support fcntl): {e}")
+
+
+        self.time_limit = time_limit
+        self.time_remaining = time_limit
+
+        # False once the bot has timed out or died, since it may still
+        # answer a move from this game; such a process must not be reused
+        self.reusable = True
+    
+    def log(self, *args):
+        if self.verbose:
+            print(*args)
+
+    def send_move(self, move: str):
+        """Sends a move to the bot's stdin."""
+        try:
+            # Check if the process is still alive before writing
+            if self.process.poll() is not None:
+                self.log(f"Bot {self.color} is dead. Cannot send move.")
+                return
+
+            self.process.stdin.write(move + '\n')
+            self.process.stdin.flush()
+        
+        # --- FIX 1: Correctly catch the exception ---
+        except (BrokenPipeError, OSError) as e:
+            # This happens if the bot died between the poll() check and the write()
+            self.log(f"Bot {self.color} error on send (BrokenPipe): {e}. Bot has likely crashed.")
+            self.reusable = False
+            self.read_stderr() # Print any last words from the bot
+
+    def new_game(self, color: str, fen: str = STARTING_FEN, moves: Optional[List[str]] = None):
+        """
+        Starts another game in the running process with the optional
+        new game command (see bot_spec.md) and resets the clock.
+        """
+        self.color = color
+        self.time_remaining = self.time_limit
+        self.send_move(" ".join(["newgame", color, fen] + list(moves or [])))
+
+    def read_stderr(self) -> str:
+        """Reads from stderr without blocking."""
+        try:
+            return self.process.stderr.read()
+        except (IOError, TypeError): # Handle no output
+            return ""
+
+    def get_move(self) -> Optional[str]:
+        """
+        Gets a move from the bot's stdout, managing the bot's total time clock.
+        Returns the move string, or None if the bot timed out, crashed, or sent EOF.
+        """
+
+        start_time = time.time()
+
+        # Bot can only use the time it has, up to the max turn timeout
+        if self.time_remaining <= 0:
+            self.log(f"Bot {self.color.upper()} is out of time before move could be requested.")
+            self.reusable = False
+            return None
+        
+        ready, _, _ = select.select([self.process.stdout], [], [], self.time_remaining)
+
+        time_spent = time.time() - start_time
+        self.time_remaining -= time_spent
+
+        if ready:
+            line = self.process.stdout.readline()
+            
+            # Check for EOF (empty string)
+            if not line: 
+                # An empty string from readline() means EOF - the process died.
+                stderr_output = self.read_stderr()
+                self.log(f"Bot {self.color} process died (EOF). Stderr:\n---\n{stderr_output}\n---")
+                self.reusable = False
+                return None # Signal death/crash
+            
+            # Print remaining time for debugging
+            self.log(f"Bot {self.color} time remaining: {self.time_remaining:.2f}s")
+            return line.strip()
+        
+        # Timeout occurred
+        self.reusable = False
+        stderr_output = self.read_stderr()
+        self.log(f"Bot {self.color} timed out. Used {time_spent:.2f}s.")
+        self.log(f"Bot {self.color} time remaining: {self.time_remaining:.2f}s")
+        return None
+    
+    def close(self):
+        """Terminate the bot process."""
+        self.log(f"Stopping {self.color} bot...")
+        if self.process.poll() is None: # Only terminate if it's running
+            try:
+                self.process.terminate()
+                self.process.wait(timeout=2) # Give it 2s to shut down gracefully
+            except Exception:
+                self.process.kill() # Force kill if terminate fails
+        
+        self.log(f"{self.color} bot stopped.")
+
+def play_game(White_bot: BotProcess, Black_bot: BotProcess,
+              fen: str = STARTING_FEN, moves: Optional[List[str]] = None,
+              verbose: bool = True, profile: Optional[GameProfile] = None) -> str:
+    """
+    Plays one game between two running bots starting from fen after the
+    opening moves (SAN) have been played. With a profile, the time spent
+    in each phase of every ply is recorded in it (see profiling.py).
+    Returns 'w' or 'b' for the winner, or 'd <reason>' for a draw.
+    """
+
+    board = chess.Board(fen)
+    for move in moves or []:
+        board.push_san(move)
+
+    def log(*args):
+        if verbose:
+            print(*args)
+
+    def timed(phase, start):
+        if profile is not None:
+            profile.add(phase, time.perf_counter_ns() - start)
+
+    start = time.perf_counter_ns()
+    log(board)
+    timed("print", start)
+
+    def opponent_of(p: str) -> str:
+        return {
+            "w": "b",
+            "b": "w"
+        }[p.lower()]
+
+    def expand_name(name: str):
+        return {
+            'w':"White",
+            'b':"Black"
+        }[name.lower()]
+
+    def process_move(player, move):
+        nonlocal board
+
+        if move is None:
+            log(f"{expand_name(player)} bot timed out / failed to make a move.")
+            return opponent_of(player)
+        
+        start = time.perf_counter_ns()
+        try:
+            parsed_move = board.parse_san(move)
+
+        except Exception as e:
+            log(f"Invalid/Illegal by {expand_name(player)}: {move} - {e}")
+            return opponent_of(player)
+        timed("parse_san", start)
+        
+        start = time.perf_counter_ns()
+        board.push_san(move)
+        timed("push_san", start)
+
+        start = time.perf_counter_ns()
+        log(f"{expand_name(player)} makes move: {move}")
+        log(board)
+        log()
+        timed("print", start)
+
+        start = time.perf_counter_ns()
+        result = check_termination(player)
+        timed("termination", start)
+        return result
+
+    def check_termination(player):
+        if board.is_checkmate():
+            log(f"{expand_name(player)} has checkmated {expand_name(opponent_of(player))}.")
+            return player
+        
+        # draw cases
+        if board.is_insufficient_material():
+            return 'd insufficient material'
+        if board.is_stalemate():
+            return 'd stalemate'
+        if board.is_seventyfive_moves():
+            return 'd seventy-five moves'
+        if board.is_fivefold_repetition():
+            return 'd fivefold repetition'
+        if board.can_claim_threefold_repetition():
+            return 'd threefold repetion'
+        
+
+    bots = {"w": White_bot, "b": Black_bot}
+    player = "w" if board.turn == chess.WHITE else "b"
+
+    while True:
+        
+        start = time.perf_counter_ns()
+        move = bots[player].get_move()
+        timed("think", start)
+        if profile is not None:
+            profile.plies += 1
+
+        wcheck = process_move(player, move)
+        if wcheck:
+            return wcheck
+
+        start = time.perf_counter_ns()
+        bots[opponent_of(player)].send_move(move)
+        timed("send_move", start)
+        player = opponent_of(player)
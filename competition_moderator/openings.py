@@ -0,0 +1,67 @@
+import os
+import re
+import csv
+import ast
+import random
+import chess
+from .moderator import STARTING_FEN
+
+
+# Opening suites for test games. An opening is a (fen, moves) pair: the
+# game starts from fen, then the SAN moves in moves are played before the
+# bots take over. Bots are told about both (see bot_spec.md).
+
+SHARED_RESOURCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "shared_resources")
+OPENINGS_CSV = os.path.join(SHARED_RESOURCES, "openings.csv")
+OPENINGS_FEN_CSV = os.path.join(SHARED_RESOURCES, "openings_fen7.csv")
+
+# Largest White win% / Black win% gap for an opening to count as balanced
+MAX_IMBALANCE = 10.0
+
+
+def parse_moves_list(moves_list: str) -> list:
+    """"['1.e4', 'Nf6', '2.e5']" -> ['e4', 'Nf6', 'e5']"""
+    return [re.sub(r"^\d+\.+", "", move) for move in ast.literal_eval(moves_list)]
+
+
+def is_playable(fen: str, moves: list) -> bool:
+    """True if the moves are legal from fen and the game is not already over."""
+    try:
+        board = chess.Board(fen)
+        for move in moves:
+            board.push_san(move)
+    except ValueError:
+        return False
+    return board.is_valid() and not board.is_game_over()
+
+
+def load_openings(path: str = OPENINGS_FEN_CSV, max_imbalance: float = MAX_IMBALANCE) -> list:
+    """
+    Reads an opening suite from a csv file. Files with a fen column
+    (openings_fen7.csv) give start positions; files with a moves_list
+    column (openings.csv) give move prefixes from the initial position,
+    keeping only balanced openings.
+    """
+    openings = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if "fen" in row:
+                opening = (row["fen"], [])
+            else:
+                try:
+                    imbalance = abs(float(row["White_win%"]) - float(row["Black_win%"]))
+                    moves = parse_moves_list(row["moves_list"])
+                except (ValueError, SyntaxError):
+                    continue
+                if imbalance > max_imbalance:
+                    continue
+                opening = (STARTING_FEN, moves)
+            if is_playable(*opening):
+                openings.append(opening)
+    return openings
+
+
+def sample_opening(path: str = OPENINGS_CSV, seed: int = None) -> tuple:
+    """Picks one random balanced opening."""
+    return random.Random(seed).choice(load_openings(path))
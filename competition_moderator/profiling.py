@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import cProfile
+import threading
+
+
+# Optional timing of the moderator's own work during a game, to tell
+# moderator overhead apart from bot think time. play_game() records each
+# phase once per ply with perf_counter_ns when given a GameProfile:
+#   think        waiting for the bot's move (get_move)
+#   parse_san    checking the move
+#   push_san     playing it on the board
+#   print        logging the move and the board
+#   termination  checkmate and draw checks
+#   send_move    writing the move to the other bot's pipe
+
+# Python 3.12+ allows one active cProfile profiler per process, so
+# profiled games are run one at a time
+_cprofile_lock = threading.Lock()
+
+PHASES = ("think", "parse_san", "push_san", "print", "termination", "send_move")
+OVERHEAD_PHASES = PHASES[1:]
+
+
+class GameProfile:
+    """Per-ply nanosecond timings of one game, by phase."""
+
+    def __init__(self):
+        self.timings = {phase: [] for phase in PHASES}
+        self.start = time.perf_counter_ns()
+        self.end = None
+        self.plies = 0
+
+    def add(self, phase: str, ns: int):
+        self.timings[phase].append(ns)
+
+    def finish(self):
+        self.end = time.perf_counter_ns()
+
+    @property
+    def wall_ns(self) -> int:
+        return (self.end or time.perf_counter_ns()) - self.start
+
+    def overhead_ns(self) -> int:
+        return sum(sum(self.timings[phase]) for phase in OVERHEAD_PHASES)
+
+    def as_dict(self) -> dict:
+        phases = {}
+        for phase, values in self.timings.items():
+            phases[phase] = {"total_ns": sum(values), "count": len(values),
+                             "max_ns": max(values, default=0)}
+        return {"plies": self.plies, "wall_ns": self.wall_ns,
+                "overhead_ns": self.overhead_ns(), "phases": phases}
+
+    def summary(self) -> str:
+        return format_summary(self.as_dict())
+
+
+def format_summary(data: dict) -> str:
+    """Table of as_dict() output (of one game or merged with merge_profiles)."""
+    wall = data["wall_ns"] or 1
+    lines = [f"Profile: {data['plies']} plies, wall {wall / 1e9:.2f}s",
+             f"  {'phase':<12}{'total ms':>10}{'mean us':>10}{'max us':>10}{'% wall':>8}"]
+    for phase in PHASES:
+        stats = data["phases"][phase]
+        mean = stats["total_ns"] / stats["count"] if stats["count"] else 0
+        lines.append(f"  {phase:<12}{stats['total_ns'] / 1e6:>10.2f}{mean / 1e3:>10.1f}"
+                     f"{stats['max_ns'] / 1e3:>10.1f}{100 * stats['total_ns'] / wall:>8.2f}")
+    per_ply = data["overhead_ns"] / data["plies"] if data["plies"] else 0
+    lines.append(f"  moderator overhead: {data['overhead_ns'] / 1e6:.2f}ms "
+                 f"({100 * data['overhead_ns'] / wall:.2f}% of wall, {per_ply / 1e3:.1f}us per ply)")
+    return "\n".join(lines)
+
+
+def merge_profiles(profiles: list) -> dict:
+    """Adds up the as_dict() output of several games."""
+    merged = {"plies": 0, "wall_ns": 0, "overhead_ns": 0,
+              "phases": {phase: {"total_ns": 0, "count": 0, "max_ns": 0} for phase in PHASES}}
+    for data in profiles:
+        for key in ("plies", "wall_ns", "overhead_ns"):
+            merged[key] += data[key]
+        for phase, stats in data["phases"].items():
+            total = merged["phases"][phase]
+            total["total_ns"] += stats["total_ns"]
+            total["count"] += stats["count"]
+            total["max_ns"] = max(total["max_ns"], stats["max_ns"])
+    return merged
+
+
+class ProfileLog:
+    """
+    Collects game profiles from any thread, appending each as a JSON line
+    to path (if given), and optionally dumps a cProfile of every game
+    into cprofile_dir. Games with a cProfile are played one at a time.
+    """
+
+    def __init__(self, path: str = None, cprofile_dir: str = None):
+        self.path = path
+        self.cprofile_dir = cprofile_dir
+        self.games = []
+        self.lock = threading.Lock()
+        if cprofile_dir:
+            os.makedirs(cprofile_dir, exist_ok=True)
+
+    def run(self, func, *args, **kwargs):
+        """Calls func(*args, profile=GameProfile(), **kwargs) and records the profile."""
+        if self.cprofile_dir:
+            profiler = cProfile.Profile()
+            with _cprofile_lock:
+                profile = GameProfile()
+                result = profiler.runcall(func, *args, profile=profile, **kwargs)
+                profile.finish()
+        else:
+            profile = GameProfile()
+            result = func(*args, profile=profile, **kwargs)
+            profile.finish()
+
+        data = profile.as_dict()
+        with self.lock:
+            self.games.append(data)
+            number = len(self.games)
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps({"game": number, **data}) + "\n")
+        if self.cprofile_dir:
+            profiler.dump_stats(os.path.join(self.cprofile_dir, f"game_{number:04d}.prof"))
+        return result
+
+    def summary(self) -> str:
+        with self.lock:
+            return format_summary(merge_profiles(self.games))
@@ -6,7 +6,8 @@ from .interface import TestInterface, CompetitionInterface
 if sys.argv[1] == "play":
     ### do stuff
 
-    play(CompetitionInterface(), color = sys.argv[2])
+    fen = sys.argv[3] if len(sys.argv) > 3 else None
+    play(CompetitionInterface(), color = sys.argv[2], fen = fen, moves = sys.argv[4:])
 
 elif sys.argv[1] == "train":
     ### do stuff
@@ -15,7 +16,8 @@ elif sys.argv[1] == "train":
 
 elif sys.argv[1] == "test":
 
-    play(TestInterface(), color = sys.argv[2])
+    fen = sys.argv[3] if len(sys.argv) > 3 else None
+    play(TestInterface(), color = sys.argv[2], fen = fen, moves = sys.argv[4:])
 
 else:
 
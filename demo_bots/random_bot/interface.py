@@ -28,4 +28,19 @@ class TestInterface(Interface):
         return input("Enter move (SAN): ")
 
     def output(self, move):
-        print(move)
\ No newline at end of file
+        print(move)
+
+NEW_GAME = "newgame"
+
+def parse_new_game(line):
+    """
+    Parses the moderator's optional new game command,
+    'newgame <color> [<fen> [<moves in SAN>...]]'.
+    Returns (color, fen, moves), or None if the line is a normal move.
+    """
+    parts = line.split()
+    if not parts or parts[0] != NEW_GAME:
+        return None
+    color = parts[1]
+    fen = " ".join(parts[2:8]) if len(parts) > 2 else None
+    return color, fen, parts[8:]
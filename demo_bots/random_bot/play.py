@@ -1,14 +1,30 @@
 import chess
 import random
-from .interface import Interface
+from .interface import Interface, parse_new_game
 
 
-def play(interface: Interface, color = "w"):
-    fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+def play(interface: Interface, color = "w", fen = None, moves = ()):
+    # Keep playing for as long as the moderator starts new games
+    while True:
+        color, fen, moves = play_game(interface, color, fen, moves)
+
+def play_game(interface: Interface, color, fen, moves):
+    """
+    Plays one game. Returns (color, fen, moves) for the next game
+    when the moderator sends a new game command.
+    """
+    if fen is None:
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
     board = chess.Board(fen)
+    for move in moves:
+        board.push_san(move)
 
-    if color == "b":
+    # Wait for the opponent if it is their turn in the start position
+    if board.turn != (color == "w"):
         move = interface.input()
+        new_game = parse_new_game(move)
+        if new_game:
+            return new_game
         board.push_san(move)
 
     while True:
@@ -18,5 +34,8 @@ def play(interface: Interface, color = "w"):
         board.push(best_move)
 
         move = interface.input()
+        new_game = parse_new_game(move)
+        if new_game:
+            return new_game
         board.push_san(move)
-        # print(board)
+        # print(board)
\ No newline at end of file
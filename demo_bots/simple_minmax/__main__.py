@@ -6,7 +6,8 @@ from .interface import TestInterface, CompetitionInterface
 if sys.argv[1] == "play":
     ### do stuff
 
-    play(CompetitionInterface(), color = sys.argv[2])
+    fen = sys.argv[3] if len(sys.argv) > 3 else None
+    play(CompetitionInterface(), color = sys.argv[2], fen = fen, moves = sys.argv[4:])
 
 elif sys.argv[1] == "train":
     ### do stuff
@@ -15,7 +16,23 @@ elif sys.argv[1] == "train":
 
 elif sys.argv[1] == "test":
 
-    play(TestInterface(), color = sys.argv[2])
+    fen = sys.argv[3] if len(sys.argv) > 3 else None
+    play(TestInterface(), color = sys.argv[2], fen = fen, moves = sys.argv[4:])
+
+elif sys.argv[1] == "perft":
+
+    from .bench import validate
+    sys.exit(0 if validate(int(sys.argv[2]) if len(sys.argv) > 2 else 3) else 1)
+
+elif sys.argv[1] == "bench":
+
+    from .bench import bench
+    bench(int(sys.argv[2]) if len(sys.argv) > 2 else 3)
+
+elif sys.argv[1] == "bench-search":
+
+    from .bench import search_bench
+    search_bench(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
 
 else:
 
@@ -0,0 +1,125 @@
+import chess
+
+
+# Attack maps and static exchange evaluation (SEE).
+#
+# An AttackMap remembers the attackers of each square in one position as
+# they are asked for, and AttackCache hands out the map for a position by
+# its Zobrist key. Move ordering, quiescence pruning and the king safety
+# term all look up the same map, so a position's attacker sets are built
+# once no matter how many of them need it.
+
+ATTACK_CACHE_SIZE = 100000  # positions kept before the cache is cleared
+
+# Exchange values; the king only ever captures last
+SEE_VALUES = [0, 1, 3, 3, 5, 9, 100]
+
+
+class AttackMap:
+    """Attacker bitboards of one position, computed lazily per square."""
+
+    __slots__ = ("attackers",)
+
+    def __init__(self):
+        # index: square for Black, 64 + square for White
+        self.attackers = [None] * 128
+
+    def attackers_mask(self, board, color, square):
+        index = square + 64 if color else square
+        mask = self.attackers[index]
+        if mask is None:
+            mask = self.attackers[index] = board.attackers_mask(color, square)
+        return mask
+
+
+class AttackCache:
+    """AttackMaps keyed by Zobrist key."""
+
+    def __init__(self, size=ATTACK_CACHE_SIZE):
+        self.size = size
+        self.maps = {}
+
+    def get(self, key):
+        attack_map = self.maps.get(key)
+        if attack_map is None:
+            if len(self.maps) >= self.size:
+                self.maps.clear()
+            attack_map = self.maps[key] = AttackMap()
+        return attack_map
+
+
+def _least_valuable(board, attackers, color):
+    """Square and piece type of color's cheapest piece in attackers."""
+    for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP,
+                       chess.ROOK, chess.QUEEN, chess.KING):
+        bb = attackers & board.pieces_mask(piece_type, color)
+        if bb:
+            return (bb & -bb).bit_length() - 1, piece_type
+    return None, None
+
+
+def see(board, move, attack_map=None):
+    """
+    Static exchange evaluation: material the side to move wins (or
+    loses, if negative) by playing move and letting both sides keep
+    recapturing on its square with their cheapest piece.
+    """
+    from_square = move.from_square
+    to_square = move.to_square
+
+    if board.is_en_passant(move):
+        captured = chess.PAWN
+    else:
+        captured = board.piece_type_at(to_square) or 0
+    attacker = board.piece_type_at(from_square)
+
+    gain = [SEE_VALUES[captured]]
+    attacker_value = SEE_VALUES[attacker]
+    if move.promotion:
+        gain[0] += SEE_VALUES[move.promotion] - SEE_VALUES[chess.PAWN]
+        attacker_value = SEE_VALUES[move.promotion]
+
+    occupied = board.occupied ^ chess.BB_SQUARES[from_square]
+    if attack_map is not None and not chess.BB_RAYS[from_square][to_square]:
+        # Off any line through the target (knight moves) the mover hides
+        # no slider, so the full-board attackers from the map are exact
+        attackers = (attack_map.attackers_mask(board, chess.WHITE, to_square) |
+                     attack_map.attackers_mask(board, chess.BLACK, to_square))
+    else:
+        # Without the mover, so sliders behind it on the line count too
+        attackers = (board.attackers_mask(chess.WHITE, to_square, occupied) |
+                     board.attackers_mask(chess.BLACK, to_square, occupied))
+    attackers &= occupied
+    side = not board.turn
+
+    # gain[d] is the balance if the piece that just landed is taken next;
+    # the last entry is always speculative and left out of the unwinding
+    while True:
+        gain.append(attacker_value - gain[-1])
+        if max(-gain[-2], gain[-1]) < 0:
+            break
+        square, piece_type = _least_valuable(board, attackers, side)
+        if square is None:
+            break
+        attacker_value = SEE_VALUES[piece_type]
+        occupied ^= chess.BB_SQUARES[square]
+        # Removing a piece may uncover a slider behind it
+        attackers = (board.attackers_mask(chess.WHITE, to_square, occupied) |
+                     board.attackers_mask(chess.BLACK, to_square, occupied)) & occupied
+        side = not side
+
+    for i in range(len(gain) - 2, 0, -1):
+        gain[i - 1] = -max(-gain[i - 1], gain[i])
+    return gain[0]
+
+
+def king_zone_attacks(board, color, attack_map):
+    """Number of squares next to color's king that the opponent attacks."""
+    king = board.king(color)
+    if king is None:
+        return 0
+    count = 0
+    for square in chess.scan_forward(chess.BB_KING_ATTACKS[king]):
+        if attack_map.attackers_mask(board, not color, square):
+            count += 1
+    return count
@@ -0,0 +1,131 @@
+import time
+import importlib
+from contextlib import contextmanager
+import chess
+from . import bitboard
+
+# Selective search toggles in play.py measured by search_bench
+PRUNING_TOGGLES = ["NULL_MOVE", "LATE_MOVE_REDUCTIONS", "FUTILITY",
+                   "REVERSE_FUTILITY", "ASPIRATION_WINDOWS"]
+
+# play.py settings under which its search is the same fixed-depth material
+# minimax as bitboard.find_best_move, so bench() compares backends only
+PLAIN_SEARCH = {"MOVE_ORDERING": False, "QUIESCENCE": False, "KING_ZONE_WEIGHT": 0,
+                "POSITION_STORE": False, **{name: False for name in PRUNING_TOGGLES}}
+
+
+# Positions used for perft validation and search timing.
+# (fen, perft node counts for depth 1, 2, 3)
+BENCH_POSITIONS = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", (20, 400, 8902)),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", (48, 2039, 97862)),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", (14, 191, 2812)),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", (6, 264, 9467)),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", (44, 1486, 62379)),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", (46, 2079, 89890)),
+]
+
+
+@contextmanager
+def patched_play(**settings):
+    """Temporarily override play.py's module settings. Yields the module."""
+    # the package's play name is the function, so fetch the module itself
+    play = importlib.import_module(".play", __package__)
+    saved = {name: getattr(play, name) for name in settings}
+    try:
+        for name, value in settings.items():
+            setattr(play, name, value)
+        yield play
+    finally:
+        for name, value in saved.items():
+            setattr(play, name, value)
+
+
+def chess_perft(board, depth):
+    """Reference perft using python-chess push/pop."""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in board.legal_moves:
+        board.push(move)
+        nodes += chess_perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+def validate(depth=3):
+    """
+    Check the bitboard move generator against python-chess with perft.
+    Returns True if every position matches.
+    """
+    ok = True
+    for fen, expected in BENCH_POSITIONS:
+        for d in range(1, depth + 1):
+            board = chess.Board(fen)
+            nodes = bitboard.perft(bitboard.Position(board), d)
+            reference = expected[d - 1] if d <= len(expected) else chess_perft(board, d)
+            if nodes != reference:
+                print(f"perft mismatch depth {d}: {nodes} != {reference} ({fen})")
+                ok = False
+    print("perft ok" if ok else "perft FAILED")
+    return ok
+
+
+def bench(depth=3):
+    """
+    Time perft and search for both backends and print nodes per second.
+    play.py's search runs with PLAIN_SEARCH so both backends search the
+    same tree.
+    """
+    with patched_play(**PLAIN_SEARCH) as play:
+        return _bench(depth, play.find_best_move)
+
+
+def _bench(depth, find_best_move):
+    results = {}
+    for name, perft_fn, search_fn in (
+        ("chess", chess_perft, find_best_move),
+        ("bitboard", lambda board, d: bitboard.perft(bitboard.Position(board), d), bitboard.find_best_move),
+    ):
+        nodes = 0
+        start = time.perf_counter()
+        for fen, _ in BENCH_POSITIONS:
+            nodes += perft_fn(chess.Board(fen), depth)
+        perft_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for fen, _ in BENCH_POSITIONS:
+            search_fn(chess.Board(fen), depth)
+        search_time = time.perf_counter() - start
+
+        results[name] = (nodes / perft_time, search_time)
+        print(f"{name:>8}: perft {nodes / perft_time:,.0f} nps, search depth {depth} {search_time:.2f}s")
+
+    chess_nps, chess_search = results["chess"]
+    bb_nps, bb_search = results["bitboard"]
+    print(f"speedup: perft {bb_nps / chess_nps:.1f}x, search {chess_search / bb_search:.1f}x")
+    return results
+
+
+def search_bench(depth=4):
+    """
+    Time the search with every pruning toggle off, with each one on by
+    itself and with all of them on. Prints the time per configuration and
+    how many best moves agree with the unpruned search.
+    """
+    def run(play, enabled):
+        for name in PRUNING_TOGGLES:
+            setattr(play, name, name in enabled)
+        start = time.perf_counter()
+        moves = [play.find_best_move(chess.Board(fen), depth) for fen, _ in BENCH_POSITIONS]
+        return time.perf_counter() - start, moves
+
+    with patched_play(**{name: False for name in PRUNING_TOGGLES}) as play:
+        base_time, base_moves = run(play, ())
+        print(f"{'none':>20}: {base_time:6.2f}s")
+        for enabled in [(name,) for name in PRUNING_TOGGLES] + [PRUNING_TOGGLES]:
+            elapsed, moves = run(play, enabled)
+            same = sum(a == b for a, b in zip(moves, base_moves))
+            label = enabled[0] if len(enabled) == 1 else "all"
+            print(f"{label:>20}: {elapsed:6.2f}s  {base_time / elapsed:4.1f}x  "
+                  f"same move {same}/{len(base_moves)}")
@@ -0,0 +1,578 @@
+import chess
+
+
+# Alternate search core working directly on integer bitboards.
+# Moves are packed into ints and the position is updated in place with
+# make()/unmake(), so the hot loop never allocates chess.Move objects
+# or copies board state the way board.push()/board.pop() do.
+
+WHITE = 1
+BLACK = 0
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+
+# Move packing: from (6 bits) | to (6 bits) | promotion (3 bits) | flag (2 bits)
+FLAG_NORMAL = 0
+FLAG_EN_PASSANT = 1
+FLAG_CASTLE = 2
+FLAG_DOUBLE_PUSH = 3
+
+# Castling rights bits
+CASTLE_WK = 1
+CASTLE_WQ = 2
+CASTLE_BK = 4
+CASTLE_BQ = 8
+
+# Precomputed attack tables (python-chess already builds these at import)
+KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+KING_ATTACKS = chess.BB_KING_ATTACKS
+PAWN_ATTACKS = [chess.BB_PAWN_ATTACKS[chess.BLACK], chess.BB_PAWN_ATTACKS[chess.WHITE]]
+DIAG_MASKS = chess.BB_DIAG_MASKS
+DIAG_ATTACKS = chess.BB_DIAG_ATTACKS
+RANK_MASKS = chess.BB_RANK_MASKS
+RANK_ATTACKS = chess.BB_RANK_ATTACKS
+FILE_MASKS = chess.BB_FILE_MASKS
+FILE_ATTACKS = chess.BB_FILE_ATTACKS
+
+BB_BACKRANKS = chess.BB_RANK_1 | chess.BB_RANK_8
+BB_DARK_SQUARES = chess.BB_DARK_SQUARES
+BB_LIGHT_SQUARES = chess.BB_LIGHT_SQUARES
+
+# Castling rights lost when a move touches a square
+CASTLE_MASK = [0xF] * 64
+CASTLE_MASK[chess.E1] &= ~(CASTLE_WK | CASTLE_WQ)
+CASTLE_MASK[chess.H1] &= ~CASTLE_WK
+CASTLE_MASK[chess.A1] &= ~CASTLE_WQ
+CASTLE_MASK[chess.E8] &= ~(CASTLE_BK | CASTLE_BQ)
+CASTLE_MASK[chess.H8] &= ~CASTLE_BK
+CASTLE_MASK[chess.A8] &= ~CASTLE_BQ
+
+# king target -> (rook from, rook to)
+CASTLE_ROOK = {
+    chess.G1: (chess.H1, chess.F1),
+    chess.C1: (chess.A1, chess.D1),
+    chess.G8: (chess.H8, chess.F8),
+    chess.C8: (chess.A8, chess.D8),
+}
+
+PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+# Piece values for evaluation, same scale as play.PIECE_VALUES
+PIECE_VALUES = [0, 1, 3, 3, 5, 9, 0]
+
+
+def to_chess_move(move):
+    """Convert a packed move into a chess.Move."""
+    promotion = (move >> 12) & 7
+    return chess.Move(move & 63, (move >> 6) & 63, promotion or None)
+
+
+class Position:
+    """
+    Compact board state on integer bitboards.
+
+    pieces[t] holds every piece of type t (1..6), colors[c] every piece of
+    color c (BLACK=0, WHITE=1) and mailbox[sq] the piece on a square
+    encoded as type | color << 3 (0 for empty).
+    """
+
+    __slots__ = ("pieces", "colors", "occupied", "mailbox", "turn",
+                 "castling", "ep_square", "halfmove_clock", "stack")
+
+    def __init__(self, board=None):
+        if board is None:
+            board = chess.Board()
+
+        self.pieces = [0,
+                       board.pawns, board.knights, board.bishops,
+                       board.rooks, board.queens, board.kings]
+        self.colors = [board.occupied_co[chess.BLACK], board.occupied_co[chess.WHITE]]
+        self.occupied = board.occupied
+        self.mailbox = [0] * 64
+        for square, piece in board.piece_map().items():
+            self.mailbox[square] = piece.piece_type | (int(piece.color) << 3)
+
+        self.turn = WHITE if board.turn == chess.WHITE else BLACK
+
+        self.castling = 0
+        if board.has_kingside_castling_rights(chess.WHITE):
+            self.castling |= CASTLE_WK
+        if board.has_queenside_castling_rights(chess.WHITE):
+            self.castling |= CASTLE_WQ
+        if board.has_kingside_castling_rights(chess.BLACK):
+            self.castling |= CASTLE_BK
+        if board.has_queenside_castling_rights(chess.BLACK):
+            self.castling |= CASTLE_BQ
+
+        self.ep_square = board.ep_square if board.ep_square is not None else -1
+        self.halfmove_clock = board.halfmove_clock
+        self.stack = []
+
+    def king_square(self, color):
+        bb = self.pieces[KING] & self.colors[color]
+        return (bb & -bb).bit_length() - 1
+
+    def is_attacked(self, square, by_color):
+        """True if by_color attacks square."""
+        pieces = self.pieces
+        them = self.colors[by_color]
+        occ = self.occupied
+
+        if KNIGHT_ATTACKS[square] & pieces[KNIGHT] & them:
+            return True
+        if KING_ATTACKS[square] & pieces[KING] & them:
+            return True
+        if PAWN_ATTACKS[by_color ^ 1][square] & pieces[PAWN] & them:
+            return True
+
+        queens = pieces[QUEEN]
+        diag = (pieces[BISHOP] | queens) & them
+        if diag and DIAG_ATTACKS[square][DIAG_MASKS[square] & occ] & diag:
+            return True
+        straight = (pieces[ROOK] | queens) & them
+        if straight and (RANK_ATTACKS[square][RANK_MASKS[square] & occ] |
+                         FILE_ATTACKS[square][FILE_MASKS[square] & occ]) & straight:
+            return True
+        return False
+
+    def in_check(self):
+        return self.is_attacked(self.king_square(self.turn), self.turn ^ 1)
+
+    def pseudo_legal_moves(self):
+        """Generate pseudo-legal moves as packed ints."""
+        moves = []
+        append = moves.append
+        pieces = self.pieces
+        turn = self.turn
+        us = self.colors[turn]
+        them = self.colors[turn ^ 1]
+        occ = self.occupied
+        empty = ~occ & chess.BB_ALL
+        targets = ~us & chess.BB_ALL
+
+        # Pawns
+        pawns = pieces[PAWN] & us
+        if turn == WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & chess.BB_RANK_3) << 8) & empty
+            step = 8
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & chess.BB_RANK_6) >> 8) & empty
+            step = -8
+
+        bb = single
+        while bb:
+            to_sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            from_sq = to_sq - step
+            if (1 << to_sq) & BB_BACKRANKS:
+                for promotion in PROMOTIONS:
+                    append(from_sq | (to_sq << 6) | (promotion << 12))
+            else:
+                append(from_sq | (to_sq << 6))
+
+        bb = double
+        while bb:
+            to_sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            append((to_sq - 2 * step) | (to_sq << 6) | (FLAG_DOUBLE_PUSH << 15))
+
+        pawn_attacks = PAWN_ATTACKS[turn]
+        bb = pawns
+        while bb:
+            from_sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            caps = pawn_attacks[from_sq] & them
+            while caps:
+                to_sq = (caps & -caps).bit_length() - 1
+                caps &= caps - 1
+                if (1 << to_sq) & BB_BACKRANKS:
+                    for promotion in PROMOTIONS:
+                        append(from_sq | (to_sq << 6) | (promotion << 12))
+                else:
+                    append(from_sq | (to_sq << 6))
+
+        ep = self.ep_square
+        if ep >= 0:
+            bb = PAWN_ATTACKS[turn ^ 1][ep] & pawns
+            while bb:
+                from_sq = (bb & -bb).bit_length() - 1
+                bb &= bb - 1
+                append(from_sq | (ep << 6) | (FLAG_EN_PASSANT << 15))
+
+        # Knights
+        bb = pieces[KNIGHT] & us
+        while bb:
+            from_sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            dests = KNIGHT_ATTACKS[from_sq] & targets
+            while dests:
+                to_sq = (dests & -dests).bit_length() - 1
+                dests &= dests - 1
+                append(from_sq | (to_sq << 6))
+
+        # Sliders
+        queens = pieces[QUEEN] & us
+        bb = (pieces[BISHOP] & us) | queens
+        while bb:
+            from_sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            dests = DIAG_ATTACKS[from_sq][DIAG_MASKS[from_sq] & occ] & targets
+            while dests:
+                to_sq = (dests & -dests).bit_length() - 1
+                dests &= dests - 1
+                append(from_sq | (to_sq << 6))
+
+        bb = (pieces[ROOK] & us) | queens
+        while bb:
+            from_sq = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            dests = (RANK_ATTACKS[from_sq][RANK_MASKS[from_sq] & occ] |
+                     FILE_ATTACKS[from_sq][FILE_MASKS[from_sq] & occ]) & targets
+            while dests:
+                to_sq = (dests & -dests).bit_length() - 1
+                dests &= dests - 1
+                append(from_sq | (to_sq << 6))
+
+        # King
+        king = pieces[KING] & us
+        from_sq = (king & -king).bit_length() - 1
+        dests = KING_ATTACKS[from_sq] & targets
+        while dests:
+            to_sq = (dests & -dests).bit_length() - 1
+            dests &= dests - 1
+            append(from_sq | (to_sq << 6))
+
+        # Castling (squares the king crosses must not be attacked)
+        castling = self.castling
+        if castling:
+            enemy = turn ^ 1
+            if turn == WHITE:
+                if (castling & CASTLE_WK and not occ & (chess.BB_F1 | chess.BB_G1)
+                        and not self.is_attacked(chess.E1, enemy)
+                        and not self.is_attacked(chess.F1, enemy)
+                        and not self.is_attacked(chess.G1, enemy)):
+                    append(chess.E1 | (chess.G1 << 6) | (FLAG_CASTLE << 15))
+                if (castling & CASTLE_WQ and not occ & (chess.BB_B1 | chess.BB_C1 | chess.BB_D1)
+                        and not self.is_attacked(chess.E1, enemy)
+                        and not self.is_attacked(chess.D1, enemy)
+                        and not self.is_attacked(chess.C1, enemy)):
+                    append(chess.E1 | (chess.C1 << 6) | (FLAG_CASTLE << 15))
+            else:
+                if (castling & CASTLE_BK and not occ & (chess.BB_F8 | chess.BB_G8)
+                        and not self.is_attacked(chess.E8, enemy)
+                        and not self.is_attacked(chess.F8, enemy)
+                        and not self.is_attacked(chess.G8, enemy)):
+                    append(chess.E8 | (chess.G8 << 6) | (FLAG_CASTLE << 15))
+                if (castling & CASTLE_BQ and not occ & (chess.BB_B8 | chess.BB_C8 | chess.BB_D8)
+                        and not self.is_attacked(chess.E8, enemy)
+                        and not self.is_attacked(chess.D8, enemy)
+                        and not self.is_attacked(chess.C8, enemy)):
+                    append(chess.E8 | (chess.C8 << 6) | (FLAG_CASTLE << 15))
+
+        return moves
+
+    def make(self, move):
+        """
+        Play a packed move in place. Returns False (with the move already
+        undone) if it leaves the mover's king in check.
+        """
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flag = move >> 15
+
+        pieces = self.pieces
+        colors = self.colors
+        mailbox = self.mailbox
+        turn = self.turn
+        enemy = turn ^ 1
+
+        moving = mailbox[from_sq]
+        piece_type = moving & 7
+        captured = mailbox[to_sq]
+
+        self.stack.append((move, captured, self.castling, self.ep_square, self.halfmove_clock))
+
+        from_bb = 1 << from_sq
+        to_bb = 1 << to_sq
+
+        if captured:
+            pieces[captured & 7] ^= to_bb
+            colors[enemy] ^= to_bb
+
+        pieces[piece_type] ^= from_bb | to_bb
+        colors[turn] ^= from_bb | to_bb
+        mailbox[from_sq] = 0
+        mailbox[to_sq] = moving
+
+        promotion = (move >> 12) & 7
+        if promotion:
+            pieces[PAWN] ^= to_bb
+            pieces[promotion] ^= to_bb
+            mailbox[to_sq] = promotion | (turn << 3)
+
+        self.ep_square = -1
+        if flag == FLAG_DOUBLE_PUSH:
+            self.ep_square = (from_sq + to_sq) >> 1
+        elif flag == FLAG_EN_PASSANT:
+            cap_sq = to_sq - 8 if turn == WHITE else to_sq + 8
+            cap_bb = 1 << cap_sq
+            pieces[PAWN] ^= cap_bb
+            colors[enemy] ^= cap_bb
+            mailbox[cap_sq] = 0
+        elif flag == FLAG_CASTLE:
+            rook_from, rook_to = CASTLE_ROOK[to_sq]
+            rook_bb = (1 << rook_from) | (1 << rook_to)
+            pieces[ROOK] ^= rook_bb
+            colors[turn] ^= rook_bb
+            mailbox[rook_to] = mailbox[rook_from]
+            mailbox[rook_from] = 0
+
+        self.castling &= CASTLE_MASK[from_sq] & CASTLE_MASK[to_sq]
+
+        if captured or piece_type == PAWN:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
+        self.occupied = colors[0] | colors[1]
+        self.turn = enemy
+
+        king = pieces[KING] & colors[turn]
+        if self.is_attacked((king & -king).bit_length() - 1, enemy):
+            self.unmake()
+            return False
+        return True
+
+    def unmake(self):
+        """Take back the last move played with make()."""
+        move, captured, castling, ep_square, halfmove_clock = self.stack.pop()
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flag = move >> 15
+
+        pieces = self.pieces
+        colors = self.colors
+        mailbox = self.mailbox
+        turn = self.turn ^ 1
+        enemy = self.turn
+
+        from_bb = 1 << from_sq
+        to_bb = 1 << to_sq
+
+        promotion = (move >> 12) & 7
+        if promotion:
+            pieces[promotion] ^= to_bb
+            pieces[PAWN] ^= to_bb
+            mailbox[to_sq] = PAWN | (turn << 3)
+
+        moving = mailbox[to_sq]
+        pieces[moving & 7] ^= from_bb | to_bb
+        colors[turn] ^= from_bb | to_bb
+        mailbox[from_sq] = moving
+        mailbox[to_sq] = captured
+
+        if captured:
+            pieces[captured & 7] ^= to_bb
+            colors[enemy] ^= to_bb
+        elif flag == FLAG_EN_PASSANT:
+            cap_sq = to_sq - 8 if turn == WHITE else to_sq + 8
+            cap_bb = 1 << cap_sq
+            pieces[PAWN] ^= cap_bb
+            colors[enemy] ^= cap_bb
+            mailbox[cap_sq] = PAWN | (enemy << 3)
+        elif flag == FLAG_CASTLE:
+            rook_from, rook_to = CASTLE_ROOK[to_sq]
+            rook_bb = (1 << rook_from) | (1 << rook_to)
+            pieces[ROOK] ^= rook_bb
+            colors[turn] ^= rook_bb
+            mailbox[rook_from] = mailbox[rook_to]
+            mailbox[rook_to] = 0
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.occupied = colors[0] | colors[1]
+        self.turn = turn
+
+    def legal_moves(self):
+        """Generate fully legal moves as packed ints."""
+        legal = []
+        for move in self.pseudo_legal_moves():
+            if self.make(move):
+                self.unmake()
+                legal.append(move)
+        return legal
+
+    def has_legal_move(self):
+        # Try king steps first: they are cheap to test and almost always
+        # settle the question without generating the full move list.
+        turn = self.turn
+        enemy = turn ^ 1
+        us = self.colors[turn]
+        king = self.pieces[KING] & us
+        king_sq = (king & -king).bit_length() - 1
+        dests = KING_ATTACKS[king_sq] & ~us
+        if dests:
+            self.occupied ^= king
+            try:
+                while dests:
+                    to_sq = (dests & -dests).bit_length() - 1
+                    dests &= dests - 1
+                    if not self.is_attacked(to_sq, enemy):
+                        return True
+            finally:
+                self.occupied ^= king
+
+        for move in self.pseudo_legal_moves():
+            if self.make(move):
+                self.unmake()
+                return True
+        return False
+
+    def has_insufficient_material(self, color):
+        """Same rule as chess.Board.has_insufficient_material()."""
+        pieces = self.pieces
+        us = self.colors[color]
+        if us & (pieces[PAWN] | pieces[ROOK] | pieces[QUEEN]):
+            return False
+        if us & pieces[KNIGHT]:
+            return (chess.popcount(us) <= 2 and
+                    not self.colors[color ^ 1] & ~pieces[KING] & ~pieces[QUEEN])
+        if us & pieces[BISHOP]:
+            bishops = pieces[BISHOP]
+            same_color = not bishops & BB_DARK_SQUARES or not bishops & BB_LIGHT_SQUARES
+            return same_color and not pieces[PAWN] and not pieces[KNIGHT]
+        return True
+
+    def is_insufficient_material(self):
+        return self.has_insufficient_material(WHITE) and self.has_insufficient_material(BLACK)
+
+    def material(self):
+        """Material balance from White's perspective."""
+        pieces = self.pieces
+        white = self.colors[WHITE]
+        score = 0
+        for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+            value = PIECE_VALUES[piece_type]
+            bb = pieces[piece_type]
+            score += value * (chess.popcount(bb & white) - chess.popcount(bb & ~white))
+        return score
+
+
+def evaluate_position(position):
+    """
+    Bitboard counterpart of play.evaluate_board().
+    Returns score from WHITE's perspective.
+    """
+    if not position.has_legal_move():
+        if position.in_check():
+            return float('-inf') if position.turn == WHITE else float('inf')
+        return 0
+
+    if position.is_insufficient_material():
+        return 0
+
+    return position.material()
+
+
+def minimax(position, depth, alpha, beta, maximizing_player):
+    """
+    Bitboard counterpart of play.minimax(). Same contract: fixed depth
+    alpha-beta, always scored from White's perspective.
+    """
+    if depth == 0:
+        return evaluate_position(position)
+    if position.is_insufficient_material():
+        return 0
+
+    make = position.make
+    unmake = position.unmake
+    searched = False
+
+    if maximizing_player:
+        max_eval = float('-inf')
+        for move in position.pseudo_legal_moves():
+            if not make(move):
+                continue
+            searched = True
+            eval_score = minimax(position, depth - 1, alpha, beta, False)
+            unmake()
+            max_eval = max(max_eval, eval_score)
+            alpha = max(alpha, eval_score)
+            if beta <= alpha:
+                break
+    else:
+        min_eval = float('inf')
+        for move in position.pseudo_legal_moves():
+            if not make(move):
+                continue
+            searched = True
+            eval_score = minimax(position, depth - 1, alpha, beta, True)
+            unmake()
+            min_eval = min(min_eval, eval_score)
+            beta = min(beta, eval_score)
+            if beta <= alpha:
+                break
+
+    if not searched:
+        # Checkmate or stalemate
+        return evaluate_position(position)
+    return max_eval if maximizing_player else min_eval
+
+
+def find_best_move(board, depth, history=None):
+    """
+    Find the best move for the current player using the bitboard core.
+
+    Args:
+        board: chess.Board object
+        depth: search depth
+        history: accepted for the same call signature as play.find_best_move;
+            the bitboard core does not track repetitions
+
+    Returns:
+        Best move as a chess.Move
+    """
+    position = Position(board)
+    best_move = None
+    alpha = float('-inf')
+    beta = float('inf')
+
+    if position.turn == WHITE:
+        best_value = float('-inf')
+        for move in position.legal_moves():
+            position.make(move)
+            board_value = minimax(position, depth - 1, alpha, beta, False)
+            position.unmake()
+
+            if best_move is None or board_value > best_value:
+                best_value = board_value
+                best_move = move
+            alpha = max(alpha, best_value)
+    else:
+        best_value = float('inf')
+        for move in position.legal_moves():
+            position.make(move)
+            board_value = minimax(position, depth - 1, alpha, beta, True)
+            position.unmake()
+
+            if best_move is None or board_value < best_value:
+                best_value = board_value
+                best_move = move
+            beta = min(beta, best_value)
+
+    return to_chess_move(best_move) if best_move is not None else None
+
+
+def perft(position, depth):
+    """Count leaf nodes of the legal move tree."""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in position.pseudo_legal_moves():
+        if position.make(move):
+            nodes += perft(position, depth - 1) if depth > 1 else 1
+            position.unmake()
+    return nodes
@@ -1,5 +1,10 @@
 import chess
-from .interface import Interface
+from .interface import Interface, parse_new_game
+from . import bitboard
+from . import tablebase
+from . import positions
+from .repetition import PositionHistory
+from .attacks import AttackCache, AttackMap, see, king_zone_attacks
 
 
 # Piece values for evaluation
@@ -12,11 +17,48 @@ PIECE_VALUES = {
     chess.KING: 0
 }
 
-def evaluate_board(board):
+# Search backend used by play(): "chess" walks chess.Board with push/pop,
+# "bitboard" uses the packed-move core in bitboard.py
+SEARCH_BACKEND = "chess"
+
+# Penalty per square next to the king that the opponent attacks
+KING_ZONE_WEIGHT = 0.1
+
+# Search SEE-good captures first (off: legal move order)
+MOVE_ORDERING = True
+
+# Search captures past the depth limit (skipping those SEE says lose material)
+QUIESCENCE = True
+
+# Selective search. Each can be switched off on its own and compared
+# with `python -m simple_minmax bench-search`.
+NULL_MOVE = True             # skip a turn; if still >= beta, prune (not in pawn endings)
+LATE_MOVE_REDUCTIONS = True  # search late quiet moves 1 ply shallower, re-search if they improve
+FUTILITY = True              # at depth 1, skip quiet moves that cannot lift eval to alpha
+REVERSE_FUTILITY = True      # near the leaves, cut if eval beats beta by a margin
+ASPIRATION_WINDOWS = True    # iterative deepening with a narrow window around the last score
+
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3            # moves searched at full depth before reducing
+FUTILITY_MARGIN = 2          # pawns
+REVERSE_FUTILITY_DEPTH = 2
+REVERSE_FUTILITY_MARGIN = 1  # pawns per ply of depth left
+ASPIRATION_WINDOW = 0.5      # pawns either side of the previous score
+NULL_WINDOW = 0.01           # smaller than any real score difference
+
+# Reuse scores searched during train() (positions.py) for nodes with at
+# least this much depth left; shallower nodes are cheaper to search
+POSITION_STORE = True
+STORE_MIN_DEPTH = 2
+
+def evaluate_board(board, attack_map=None):
     """
-    Evaluate the board based on material count.
+    Evaluate the board based on material count and king safety.
     Returns score from WHITE's perspective.
     Positive score favors white, negative favors black.
+    attack_map is the cached AttackMap for this position, if any.
     """
     if board.is_checkmate():
         # If it's White's turn and checkmate, White lost (bad for White)
@@ -25,6 +67,10 @@ def evaluate_board(board):
     
     if board.is_stalemate() or board.is_insufficient_material():
         return 0
+
+    tb_score = tablebase.probe_score(board)
+    if tb_score is not None:
+        return tb_score
     
     score = 0
     for square in chess.SQUARES:
@@ -32,10 +78,96 @@ def evaluate_board(board):
         if piece:
             value = PIECE_VALUES[piece.piece_type]
             score += value if piece.color == chess.WHITE else -value
+
+    if not KING_ZONE_WEIGHT:
+        return score
+    if attack_map is None:
+        attack_map = AttackMap()
+    score -= KING_ZONE_WEIGHT * (king_zone_attacks(board, chess.WHITE, attack_map) -
+                                 king_zone_attacks(board, chess.BLACK, attack_map))
     
     return score
 
-def minimax(board, depth, alpha, beta, maximizing_player):
+def order_moves(board, attack_map):
+    """
+    Legal moves sorted for alpha-beta: captures that SEE says win or
+    break even first (best first), then quiet moves, then losing captures.
+    """
+    if not MOVE_ORDERING:
+        return list(board.legal_moves)
+    scored = []
+    for move in board.legal_moves:
+        if move.promotion or board.is_capture(move):
+            gain = see(board, move, attack_map)
+            score = 1000 + gain if gain >= 0 else gain
+        else:
+            score = 0
+        scored.append((score, move))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in scored]
+
+def quiescence(board, alpha, beta, maximizing_player, history, attack_cache):
+    """
+    Searches captures only until the position is quiet, so the static
+    evaluation is never taken in the middle of an exchange. Captures
+    that lose material by SEE are pruned.
+    """
+    attack_map = attack_cache.get(history.key)
+    stand_pat = evaluate_board(board, attack_map)
+    if stand_pat in (float('inf'), float('-inf')):
+        return stand_pat
+
+    captures = []
+    for move in board.generate_legal_captures():
+        gain = see(board, move, attack_map)
+        if gain >= 0:
+            captures.append((gain, move))
+    captures.sort(key=lambda item: item[0], reverse=True)
+
+    if maximizing_player:
+        if stand_pat >= beta:
+            return stand_pat
+        best = stand_pat
+        alpha = max(alpha, stand_pat)
+        for _, move in captures:
+            history.push(board, move)
+            score = quiescence(board, alpha, beta, False, history, attack_cache)
+            history.pop(board)
+            best = max(best, score)
+            alpha = max(alpha, score)
+            if beta <= alpha:
+                break
+        return best
+    else:
+        if stand_pat <= alpha:
+            return stand_pat
+        best = stand_pat
+        beta = min(beta, stand_pat)
+        for _, move in captures:
+            history.push(board, move)
+            score = quiescence(board, alpha, beta, True, history, attack_cache)
+            history.pop(board)
+            best = min(best, score)
+            beta = min(beta, score)
+            if beta <= alpha:
+                break
+        return best
+
+def is_draw(board, history):
+    """
+    Cheap draw test for search nodes: repetition from the Zobrist
+    history and the 75-move rule. Insufficient material is left to the
+    caller, and checkmate and stalemate fall out of the move loop, so the
+    full board.is_game_over() never runs inside the search.
+    """
+    return history.is_repetition() or board.halfmove_clock >= 150
+
+def has_non_pawn_material(board, color):
+    """Null move is unsafe in king and pawn endings, where zugzwang is common."""
+    return bool(board.occupied_co[color] & ~(board.pawns | board.kings))
+
+def minimax(board, depth, alpha, beta, maximizing_player, history=None, attack_cache=None,
+            allow_null=True):
     """
     Minimax algorithm with alpha-beta pruning.
     Always evaluates from White's perspective.
@@ -46,19 +178,90 @@ def minimax(board, depth, alpha, beta, maximizing_player):
         alpha: best value for maximizer
         beta: best value for minimizer
         maximizing_player: True if White's turn, False if Black's turn
+        history: PositionHistory of the current line (built from board if None)
+        attack_cache: AttackCache shared by the whole search (new one if None)
+        allow_null: False right after a null move, so two are never played in a row
     
     Returns:
         Best evaluation score from White's perspective
     """
-    if depth == 0 or board.is_game_over():
+    if history is None:
+        history = PositionHistory(board)
+    if attack_cache is None:
+        attack_cache = AttackCache()
+
+    if is_draw(board, history):
+        return 0
+    if depth == 0:
+        if QUIESCENCE:
+            return quiescence(board, alpha, beta, maximizing_player, history, attack_cache)
+        return evaluate_board(board, attack_cache.get(history.key))
+    if board.is_insufficient_material():
+        return 0
+    if POSITION_STORE and depth >= STORE_MIN_DEPTH and positions.SHARDS:
+        stored = positions.probe(history.key)
+        if stored is not None and stored[1] >= depth:
+            return stored[0]
+
+    attack_map = attack_cache.get(history.key)
+    moves = order_moves(board, attack_map)
+    if not moves:
+        # Checkmate or stalemate
         return evaluate_board(board)
-    
+
+    in_check = board.is_check()
+    try_null = NULL_MOVE and allow_null and depth >= NULL_MOVE_MIN_DEPTH and \
+        has_non_pawn_material(board, board.turn)
+    static_eval = None
+    if not in_check and (try_null or ((FUTILITY or REVERSE_FUTILITY) and depth <= REVERSE_FUTILITY_DEPTH)):
+        static_eval = evaluate_board(board, attack_map)
+
+    if REVERSE_FUTILITY and static_eval is not None and depth <= REVERSE_FUTILITY_DEPTH:
+        margin = REVERSE_FUTILITY_MARGIN * depth
+        if maximizing_player and static_eval - margin >= beta:
+            return static_eval
+        if not maximizing_player and static_eval + margin <= alpha:
+            return static_eval
+
+    if try_null and static_eval is not None:
+        if maximizing_player and static_eval >= beta:
+            history.push_null(board)
+            score = minimax(board, depth - 1 - NULL_MOVE_REDUCTION, beta - NULL_WINDOW, beta,
+                            False, history, attack_cache, False)
+            history.pop(board)
+            if score >= beta:
+                return beta
+        elif not maximizing_player and static_eval <= alpha:
+            history.push_null(board)
+            score = minimax(board, depth - 1 - NULL_MOVE_REDUCTION, alpha, alpha + NULL_WINDOW,
+                            True, history, attack_cache, False)
+            history.pop(board)
+            if score <= alpha:
+                return alpha
+
+    futile = FUTILITY and static_eval is not None and depth == 1 and (
+        static_eval + FUTILITY_MARGIN <= alpha if maximizing_player
+        else static_eval - FUTILITY_MARGIN >= beta)
+    can_reduce = LATE_MOVE_REDUCTIONS and depth >= LMR_MIN_DEPTH and not in_check
+
     if maximizing_player:
         max_eval = float('-inf')
-        for move in board.legal_moves:
-            board.push(move)
-            eval_score = minimax(board, depth - 1, alpha, beta, False)
-            board.pop()
+        for i, move in enumerate(moves):
+            quiet = not (move.promotion or board.is_capture(move))
+            reduce = can_reduce and quiet and i >= LMR_MIN_MOVES
+            if quiet and (reduce or (futile and i > 0)) and board.gives_check(move):
+                reduce = False
+            elif futile and quiet and i > 0:
+                continue
+
+            history.push(board, move)
+            if reduce:
+                eval_score = minimax(board, depth - 2, alpha, alpha + NULL_WINDOW, False, history, attack_cache)
+                if eval_score > alpha:
+                    eval_score = minimax(board, depth - 1, alpha, beta, False, history, attack_cache)
+            else:
+                eval_score = minimax(board, depth - 1, alpha, beta, False, history, attack_cache)
+            history.pop(board)
             max_eval = max(max_eval, eval_score)
             alpha = max(alpha, eval_score)
             if beta <= alpha:
@@ -66,74 +269,191 @@ def minimax(board, depth, alpha, beta, maximizing_player):
         return max_eval
     else:
         min_eval = float('inf')
-        for move in board.legal_moves:
-            board.push(move)
-            eval_score = minimax(board, depth - 1, alpha, beta, True)
-            board.pop()
+        for i, move in enumerate(moves):
+            quiet = not (move.promotion or board.is_capture(move))
+            reduce = can_reduce and quiet and i >= LMR_MIN_MOVES
+            if quiet and (reduce or (futile and i > 0)) and board.gives_check(move):
+                reduce = False
+            elif futile and quiet and i > 0:
+                continue
+
+            history.push(board, move)
+            if reduce:
+                eval_score = minimax(board, depth - 2, beta - NULL_WINDOW, beta, True, history, attack_cache)
+                if eval_score < beta:
+                    eval_score = minimax(board, depth - 1, alpha, beta, True, history, attack_cache)
+            else:
+                eval_score = minimax(board, depth - 1, alpha, beta, True, history, attack_cache)
+            history.pop(board)
             min_eval = min(min_eval, eval_score)
             beta = min(beta, eval_score)
             if beta <= alpha:
                 break
         return min_eval
 
-def find_best_move(board, depth):
+def search_root(board, moves, depth, alpha, beta, history, attack_cache):
     """
-    Find the best move for the current player.
-    
-    Args:
-        board: chess.Board object
-        depth: search depth
-    
-    Returns:
-        Best move in UCI notation (e.g., 'e2e4')
+    Searches the root moves in order within (alpha, beta).
+    Returns (best value, best move).
     """
     best_move = None
-    alpha = float('-inf')
-    beta = float('inf')
     
     if board.turn == chess.WHITE:
         # White wants to MAXIMIZE the score
         best_value = float('-inf')
-        for move in board.legal_moves:
-            board.push(move)
-            board_value = minimax(board, depth - 1, alpha, beta, False)
-            board.pop()
+        for move in moves:
+            history.push(board, move)
+            board_value = minimax(board, depth - 1, alpha, beta, False, history, attack_cache)
+            history.pop(board)
             
-            if board_value > best_value:
+            if best_move is None or board_value > best_value:
                 best_value = board_value
                 best_move = move
             alpha = max(alpha, best_value)
     else:
         # Black wants to MINIMIZE the score
         best_value = float('inf')
-        for move in board.legal_moves:
-            board.push(move)
-            board_value = minimax(board, depth - 1, alpha, beta, True)
-            board.pop()
+        for move in moves:
+            history.push(board, move)
+            board_value = minimax(board, depth - 1, alpha, beta, True, history, attack_cache)
+            history.pop(board)
             
-            if board_value < best_value:
+            if best_move is None or board_value < best_value:
                 best_value = board_value
                 best_move = move
             beta = min(beta, best_value)
     
-    return best_move
+    return best_value, best_move
+
+def search_position(board, depth, history=None):
+    """
+    Search the current position.
+    
+    Args:
+        board: chess.Board object
+        depth: search depth
+        history: PositionHistory of the game so far (built from board if None)
+    
+    Returns:
+        (score from White's perspective, best move)
+    """
+    if history is None:
+        history = PositionHistory(board)
+    attack_cache = AttackCache()
+    moves = order_moves(board, attack_cache.get(history.key))
+    full_window = (float('-inf'), float('inf'))
+
+    if not ASPIRATION_WINDOWS or not moves:
+        return search_root(board, moves, depth, *full_window, history, attack_cache)
+
+    # Iterative deepening: each iteration searches a narrow window around
+    # the previous score and starts with the previous best move
+    value = None
+    for iteration_depth in range(1, depth + 1):
+        if value is None or value in full_window:
+            window = full_window
+        else:
+            window = (value - ASPIRATION_WINDOW, value + ASPIRATION_WINDOW)
+        value, best_move = search_root(board, moves, iteration_depth, *window, history, attack_cache)
+        if window != full_window and not window[0] < value < window[1]:
+            # Fell outside the window: the score is only a bound, search again
+            value, best_move = search_root(board, moves, iteration_depth, *full_window, history, attack_cache)
+        moves.remove(best_move)
+        moves.insert(0, best_move)
+
+    return value, best_move
+
+def find_best_move(board, depth, history=None):
+    """
+    Find the best move for the current player.
+    
+    Args:
+        board: chess.Board object
+        depth: search depth
+        history: PositionHistory of the game so far (built from board if None)
+    
+    Returns:
+        Best move in UCI notation (e.g., 'e2e4')
+    """
+    return search_position(board, depth, history)[1]
+
+def repeats_position(board, history, move):
+    """True if move returns to a position already on history's line."""
+    history.push(board, move)
+    repeated = history.is_repetition()
+    history.pop(board)
+    return repeated
+
+def stored_move(board, history, depth):
+    """
+    Best move from the position store if it was searched at least as deep.
+    Stored moves are chosen without the game's history, so one that
+    repeats a position of this game is left to the search to judge.
+    """
+    if not POSITION_STORE:
+        return None
+    stored = positions.probe(history.key)
+    if stored is None or stored[1] < depth or stored[2] is None or \
+            stored[2] not in board.legal_moves:
+        return None
+    if repeats_position(board, history, stored[2]):
+        return None
+    return stored[2]
 
-def play(interface: Interface, color = "w"):
+def play(interface: Interface, color = "w", fen = None, moves = (), backend = SEARCH_BACKEND):
+    search = bitboard.find_best_move if backend == "bitboard" else find_best_move
+    tablebase.load_tablebases()
+    positions.load_store()
+
+    # Keep playing for as long as the moderator starts new games
+    while True:
+        color, fen, moves = play_game(interface, search, color, fen, moves)
+
+def play_game(interface: Interface, search, color, fen, moves):
+    """
+    Plays one game. Returns (color, fen, moves) for the next game
+    when the moderator sends a new game command.
+    """
     search_depth = 4  # Can be any positive number
-    fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+    if fen is None:
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
     board = chess.Board(fen)
+    for move in moves:
+        board.push_san(move)
+
+    # Only positions since the last irreversible move can repeat, so the
+    # board's move stack is dropped there and the keys are kept instead
+    history = PositionHistory(board)
+
+    def push(move):
+        history.push(board, move)
+        history.compact()
+        if history.count == 1:
+            board.clear_stack()
 
     # color = interface.input()
 
-    if color == "b":
+    # Wait for the opponent if it is their turn in the start position
+    if board.turn != (color == "w"):
         move = interface.input()
-        board.push_san(move)
+        new_game = parse_new_game(move)
+        if new_game:
+            return new_game
+        push(board.parse_san(move))
 
     while True:
-        best_move = find_best_move(board, search_depth)
+        # Solved endings are read straight from the tablebase
+        best_move = tablebase.best_move(board)
+        if best_move is None:
+            best_move = stored_move(board, history, search_depth)
+        if best_move is None:
+            best_move = search(board, search_depth, history)
         interface.output(board.san(best_move))
-        board.push(best_move)
+        push(best_move)
 
         move = interface.input()
-        board.push_san(move)
-        # print(board)
+        new_game = parse_new_game(move)
+        if new_game:
+            return new_game
+        push(board.parse_san(move))
+        # print(board)
\ No newline at end of file
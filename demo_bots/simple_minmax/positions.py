@@ -0,0 +1,191 @@
+import os
+import mmap
+import bisect
+from array import array
+import chess
+
+
+# Position store: search results saved by train() and reused by play().
+#
+# Every entry is keyed by the position's Zobrist key (repetition.py) and
+# holds the score from White's perspective, the depth it was searched to
+# and the best move found. Entries are split into 256 shard files by the
+# top byte of the key. Each shard is stored as four arrays back to back,
+# sorted by key:
+#   keys    uint64[n]
+#   scores  float32[n]
+#   moves   uint16[n]   from | to << 6 | promotion << 12, 0 for none
+#   depths  uint8[n]
+# so opening a shard is one mmap and a probe is a binary search over the
+# keys with no parsing. Shards are only mapped the first time they are
+# probed, so loading the store costs a directory listing.
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "positions")
+SHARD_BITS = 8
+RECORD_SIZE = 8 + 4 + 2 + 1
+SIZE_LIMIT = 4 * 1024 ** 3  # bytes; with the tablebases still well inside 20GB per bot
+
+# Loaded shards, shard number -> Shard (or path until first probed)
+SHARDS = {}
+
+
+def shard_path(number, directory=STORE_DIR):
+    return os.path.join(directory, f"shard_{number:02x}.bin")
+
+
+def shard_of(key):
+    return key >> (64 - SHARD_BITS)
+
+
+def encode_move(move):
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def decode_move(value):
+    if not value:
+        return None
+    return chess.Move(value & 63, (value >> 6) & 63, (value >> 12) or None)
+
+
+class Shard:
+    """One memory-mapped shard file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        n = len(self.map) // RECORD_SIZE
+        view = memoryview(self.map)
+        self.keys = view[:8 * n].cast("Q")
+        self.scores = view[8 * n:12 * n].cast("f")
+        self.moves = view[12 * n:14 * n].cast("H")
+        self.depths = view[14 * n:15 * n]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, key):
+        """Index of key, or -1."""
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return -1
+
+    def entries(self):
+        """All entries as {key: (score, depth, move)}."""
+        return dict(zip(self.keys, zip(self.scores, self.depths, self.moves)))
+
+    def close(self):
+        for view in (self.keys, self.scores, self.moves, self.depths):
+            view.release()
+        self.map.close()
+
+
+def _is_shard(path):
+    size = os.path.getsize(path)
+    return size > 0 and size % RECORD_SIZE == 0
+
+
+def load_store(directory=STORE_DIR):
+    """Find the shard files in directory. Returns the number found."""
+    close_store()
+    if not os.path.isdir(directory):
+        return 0
+    for number in range(1 << SHARD_BITS):
+        path = shard_path(number, directory)
+        if os.path.exists(path) and _is_shard(path):
+            SHARDS[number] = path
+    return len(SHARDS)
+
+
+def close_store():
+    for shard in SHARDS.values():
+        if isinstance(shard, Shard):
+            shard.close()
+    SHARDS.clear()
+
+
+def _shard(number):
+    shard = SHARDS.get(number)
+    if isinstance(shard, str):
+        shard = SHARDS[number] = Shard(shard)
+    return shard
+
+
+def probe(key):
+    """
+    Look up a Zobrist key.
+    Returns (score, depth, move) or None if the position is not stored.
+    """
+    if not SHARDS:
+        return None
+    shard = _shard(shard_of(key))
+    if shard is None:
+        return None
+    i = shard.find(key)
+    if i < 0:
+        return None
+    return shard.scores[i], shard.depths[i], decode_move(shard.moves[i])
+
+
+def store_size(directory=STORE_DIR):
+    """Total bytes used by the shard files in directory."""
+    total = 0
+    for number in range(1 << SHARD_BITS):
+        path = shard_path(number, directory)
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def write_entries(entries, directory=STORE_DIR, size_limit=SIZE_LIMIT):
+    """
+    Merge {key: (score, depth, move)} into the store on disk, keeping the
+    deeper result when a key is already stored. New positions are dropped
+    once the store would grow past size_limit. Returns the number of
+    entries added or replaced.
+    """
+    os.makedirs(directory, exist_ok=True)
+    close_store()
+    room = (size_limit - store_size(directory)) // RECORD_SIZE
+
+    by_shard = {}
+    for key, entry in entries.items():
+        by_shard.setdefault(shard_of(key), []).append((key, entry))
+
+    written = 0
+    for number, new in sorted(by_shard.items()):
+        path = shard_path(number, directory)
+        merged = {}
+        if os.path.exists(path) and _is_shard(path):
+            shard = Shard(path)
+            merged = shard.entries()
+            shard.close()
+
+        changed = False
+        for key, (score, depth, move) in new:
+            old = merged.get(key)
+            if old is None:
+                if room <= 0:
+                    continue
+                room -= 1
+            elif old[1] > depth:
+                continue
+            merged[key] = (score, depth, encode_move(move) if move else 0)
+            written += 1
+            changed = True
+        if not changed:
+            continue
+
+        keys = sorted(merged)
+        values = [merged[key] for key in keys]
+        # Write next to the shard and swap it in, so a reader never sees half a file
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            array("Q", keys).tofile(f)
+            array("f", [v[0] for v in values]).tofile(f)
+            array("H", [v[2] for v in values]).tofile(f)
+            array("B", [v[1] for v in values]).tofile(f)
+        os.replace(tmp, path)
+
+    load_store(directory)
+    return written
@@ -0,0 +1,172 @@
+import random
+from array import array
+import chess
+
+
+# Repetition tracking for search without walking chess.Board's move stack.
+#
+# PositionHistory keeps the Zobrist key of every position on the current
+# line (game moves followed by search moves) in a fixed-size array. A
+# position can only repeat one played since the last irreversible move
+# (capture, pawn move or loss of castling rights), so each entry also
+# records where its reversible stretch starts and the scan stops there.
+
+HISTORY_SIZE = 512  # covers the 75-move rule (150 plies) plus search depth
+
+_rng = random.Random(0x5EED)
+
+PIECE_KEYS = [[[_rng.getrandbits(64) for _ in chess.SQUARES]
+               for _ in range(7)]
+              for _ in chess.COLORS]
+TURN_KEY = _rng.getrandbits(64)
+EP_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+
+_CORNERS = (chess.A1, chess.H1, chess.A8, chess.H8)
+_CORNER_KEYS = [_rng.getrandbits(64) for _ in _CORNERS]
+CASTLING_KEYS = {}
+for _mask in range(16):
+    _rights = 0
+    _key = 0
+    for _i, _square in enumerate(_CORNERS):
+        if _mask & (1 << _i):
+            _rights |= chess.BB_SQUARES[_square]
+            _key ^= _CORNER_KEYS[_i]
+    CASTLING_KEYS[_rights] = _key
+
+BB_CORNERS = chess.BB_A1 | chess.BB_H1 | chess.BB_A8 | chess.BB_H8
+
+# king destination -> (rook from, rook to) for standard castling
+CASTLING_ROOKS = {
+    chess.G1: (chess.H1, chess.F1),
+    chess.C1: (chess.A1, chess.D1),
+    chess.G8: (chess.H8, chess.F8),
+    chess.C8: (chess.A8, chess.D8),
+}
+
+
+def _ep_key(board):
+    """En passant only counts when a pawn could actually capture there."""
+    ep_square = board.ep_square
+    if ep_square is not None and chess.BB_PAWN_ATTACKS[not board.turn][ep_square] & \
+            board.pawns & board.occupied_co[board.turn]:
+        return EP_KEYS[ep_square & 7]
+    return 0
+
+
+def zobrist_key(board):
+    """Full Zobrist key of a board (incremental updates use PositionHistory.push)."""
+    key = 0
+    for square, piece in board.piece_map().items():
+        key ^= PIECE_KEYS[piece.color][piece.piece_type][square]
+    if board.turn == chess.BLACK:
+        key ^= TURN_KEY
+    key ^= CASTLING_KEYS[board.castling_rights & BB_CORNERS]
+    return key ^ _ep_key(board)
+
+
+class PositionHistory:
+    """
+    Zobrist keys of the current line with push/pop mirroring
+    board.push()/board.pop().
+    """
+
+    def __init__(self, board, size=HISTORY_SIZE):
+        self.keys = array("Q", bytes(8 * size))
+        self.starts = array("H", bytes(2 * size))
+        self.reset(board)
+
+    def reset(self, board):
+        """Forget everything but the current position."""
+        self.keys[0] = zobrist_key(board)
+        self.starts[0] = 0
+        self.count = 1
+
+    @property
+    def key(self):
+        return self.keys[self.count - 1]
+
+    def push(self, board, move):
+        """Play move on board and record the new position's key."""
+        turn = board.turn
+        from_square = move.from_square
+        to_square = move.to_square
+        piece_type = board.piece_type_at(from_square)
+        own = PIECE_KEYS[turn]
+
+        key = self.keys[self.count - 1] ^ TURN_KEY
+        key ^= own[piece_type][from_square] ^ own[move.promotion or piece_type][to_square]
+
+        if piece_type == chess.KING and to_square in CASTLING_ROOKS and \
+                abs(to_square - from_square) == 2:
+            rook_from, rook_to = CASTLING_ROOKS[to_square]
+            key ^= own[chess.ROOK][rook_from] ^ own[chess.ROOK][rook_to]
+        elif piece_type == chess.PAWN and to_square == board.ep_square:
+            captured_square = to_square - 8 if turn == chess.WHITE else to_square + 8
+            key ^= PIECE_KEYS[not turn][chess.PAWN][captured_square]
+        else:
+            captured = board.piece_type_at(to_square)
+            if captured:
+                key ^= PIECE_KEYS[not turn][captured][to_square]
+
+        castling = board.castling_rights & BB_CORNERS
+        if board.ep_square is not None:
+            key ^= _ep_key(board)
+        board.push(move)
+
+        new_castling = board.castling_rights & BB_CORNERS
+        if castling != new_castling:
+            key ^= CASTLING_KEYS[castling] ^ CASTLING_KEYS[new_castling]
+        if board.ep_square is not None:
+            key ^= _ep_key(board)
+
+        n = self.count
+        self.keys[n] = key
+        # Irreversible move: nothing before this position can repeat
+        if board.halfmove_clock == 0 or castling != new_castling:
+            self.starts[n] = n
+        else:
+            self.starts[n] = self.starts[n - 1]
+        self.count = n + 1
+
+    def push_null(self, board):
+        """Pass the turn (null move search). Repetitions never span a null move."""
+        key = self.keys[self.count - 1] ^ TURN_KEY
+        if board.ep_square is not None:
+            key ^= _ep_key(board)
+        board.push(chess.Move.null())
+
+        n = self.count
+        self.keys[n] = key
+        self.starts[n] = n
+        self.count = n + 1
+
+    def pop(self, board):
+        """Take back the last move on board and in the history."""
+        board.pop()
+        self.count -= 1
+
+    def is_repetition(self):
+        """True if the current position occurred earlier on this line."""
+        n = self.count - 1
+        key = self.keys[n]
+        start = self.starts[n]
+        i = n - 4  # a position can first repeat after two moves each
+        while i >= start:
+            if self.keys[i] == key:
+                return True
+            i -= 2
+        return False
+
+    def compact(self):
+        """
+        Drop entries before the last irreversible move. Called between
+        game moves so the array only ever holds the reversible stretch.
+        """
+        n = self.count - 1
+        start = self.starts[n]
+        if start == 0:
+            return
+        self.keys[0:n - start + 1] = self.keys[start:n + 1]
+        for i in range(n - start + 1):
+            self.starts[i] = 0
+        self.count = n - start + 1
@@ -0,0 +1,443 @@
+import os
+import mmap
+import itertools
+from array import array
+import chess
+
+
+# Endgame tablebases built by retrograde analysis during train().
+#
+# Each material signature ("KQvK", "KRvK", "KPvK", ...) gets one file with a
+# byte per position, indexed by side to move and piece squares, so a probe is
+# a single mmap lookup. The byte is scored for the side to move:
+#   0          draw (or illegal / not reached)
+#   1..127     win, mate in that many plies
+#   128 + d    loss, mated in d plies
+#
+# Tables are always stored with the stronger side as White; positions with
+# the colors reversed are probed through a color flip.
+
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+DEFAULT_SIGNATURES = ("KQvK", "KRvK", "KPvK")
+MAX_PIECES = 4
+SIZE_LIMIT = 2 * 1024 ** 3  # bytes, well inside the 20GB disk allowance per bot
+
+DRAW = 0
+LOSS = 128
+MAX_DISTANCE = 127
+
+# Score returned to evaluate_board() for a won ending, minus the distance
+TB_WIN = 1000
+
+PIECE_ORDER = "KQRBNP"
+PIECE_TYPES = {symbol: chess.PIECE_SYMBOLS.index(symbol.lower()) for symbol in PIECE_ORDER}
+PROMOTIONS = (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT)
+
+# Loaded tables, signature -> mmap (or bytearray while building)
+TABLES = {}
+
+
+def parse_signature(signature):
+    """'KQvK' -> [(WHITE, KING), (WHITE, QUEEN), (BLACK, KING)]"""
+    white, black = signature.upper().split("V")
+    return ([(chess.WHITE, PIECE_TYPES[s]) for s in white] +
+            [(chess.BLACK, PIECE_TYPES[s]) for s in black])
+
+
+def side_string(piece_types):
+    return "".join(sorted((chess.piece_symbol(t).upper() for t in piece_types),
+                          key=PIECE_ORDER.index))
+
+
+def is_drawn_material(signature):
+    """Bare kings, or a single minor piece, can never mate."""
+    others = signature.upper().replace("K", "").replace("V", "")
+    return len(others) == 0 or (len(others) == 1 and others in "BN")
+
+
+def table_path(signature, directory=TABLEBASE_DIR):
+    return os.path.join(directory, f"{signature}.bin")
+
+
+def table_size(signature):
+    return 2 * 64 ** (len(signature) - 1)
+
+
+def _attacks(piece_type, color, square, occupied):
+    if piece_type == chess.KING:
+        return chess.BB_KING_ATTACKS[square]
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[square]
+    if piece_type == chess.PAWN:
+        return chess.BB_PAWN_ATTACKS[color][square]
+    attacks = 0
+    if piece_type in (chess.BISHOP, chess.QUEEN):
+        attacks |= chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied]
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        attacks |= (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied] |
+                    chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied])
+    return attacks
+
+
+def _is_attacked(pieces, squares, square, by_color, occupied, skip=-1):
+    for i, (color, piece_type) in enumerate(pieces):
+        if color == by_color and i != skip and \
+                _attacks(piece_type, color, squares[i], occupied) & chess.BB_SQUARES[square]:
+            return True
+    return False
+
+
+def _king_index(pieces, color):
+    for i, (c, piece_type) in enumerate(pieces):
+        if c == color and piece_type == chess.KING:
+            return i
+
+
+def _probe_pieces(piece_list, turn):
+    """
+    Probe a position given as [(color, piece_type, square), ...].
+    Returns the table byte for the side to move, or None if no table applies.
+    """
+    white = side_string(t for c, t, _ in piece_list if c == chess.WHITE)
+    black = side_string(t for c, t, _ in piece_list if c == chess.BLACK)
+    signature = f"{white}v{black}"
+
+    if signature not in TABLES:
+        flipped = f"{black}v{white}"
+        if flipped not in TABLES:
+            if is_drawn_material(signature):
+                return DRAW
+            return None
+        signature = flipped
+        piece_list = [(not c, t, sq ^ 56) for c, t, sq in piece_list]
+        turn = not turn
+
+    remaining = sorted(piece_list, key=lambda p: (not p[0], PIECE_ORDER.index(chess.piece_symbol(p[1]).upper())))
+    index = 0 if turn == chess.WHITE else 1
+    for _, _, square in remaining:
+        index = index * 64 + square
+    return TABLES[signature][index]
+
+
+def _child_value(pieces, squares, turn, captured=-1, promoted=-1, promotion=0):
+    """Probe the table a capture or promotion leads into."""
+    piece_list = []
+    for i, (color, piece_type) in enumerate(pieces):
+        if i == captured:
+            continue
+        piece_list.append((color, promotion if i == promoted else piece_type, squares[i]))
+    return _probe_pieces(piece_list, turn)
+
+
+def build_table(signature):
+    """
+    Retrograde analysis for one material signature.
+    Child tables (captures, promotions) must already be in TABLES.
+    Returns the finished table as a bytearray.
+    """
+    pieces = parse_signature(signature)
+    n = len(pieces)
+    stride = [64 ** (n - 1 - i) for i in range(n)]
+    half = 64 ** n
+    size = 2 * half
+
+    result = bytearray(size)
+    legal = bytearray(size)
+    remaining = array("H", bytes(2 * size))
+
+    # buckets[d]: positions resolved at distance d (to propagate),
+    # exit wins that become available at d, and child wins at d
+    resolved = [[] for _ in range(MAX_DISTANCE + 2)]
+    exit_wins = [[] for _ in range(MAX_DISTANCE + 2)]
+    child_wins = [[] for _ in range(MAX_DISTANCE + 2)]
+
+    kings = (_king_index(pieces, chess.BLACK), _king_index(pieces, chess.WHITE))
+    pawns = [i for i, (_, t) in enumerate(pieces) if t == chess.PAWN]
+
+    for squares in itertools.product(range(64), repeat=n):
+        occupied = 0
+        for square in squares:
+            occupied |= chess.BB_SQUARES[square]
+        if chess.popcount(occupied) != n:
+            continue
+        if any(chess.BB_SQUARES[squares[i]] & (chess.BB_RANK_1 | chess.BB_RANK_8) for i in pawns):
+            continue
+
+        base = 0
+        for i in range(n):
+            base += squares[i] * stride[i]
+
+        for turn in (chess.WHITE, chess.BLACK):
+            # The side not to move may not be in check
+            if _is_attacked(pieces, squares, squares[kings[not turn]], turn, occupied):
+                continue
+            index = base if turn == chess.WHITE else base + half
+            legal[index] = 1
+
+            count = 0
+            for i, (color, piece_type) in enumerate(pieces):
+                if color != turn:
+                    continue
+                from_bb = chess.BB_SQUARES[squares[i]]
+                own = 0
+                for j, (c, _) in enumerate(pieces):
+                    if c == turn:
+                        own |= chess.BB_SQUARES[squares[j]]
+
+                if piece_type == chess.PAWN:
+                    step = 8 if turn == chess.WHITE else -8
+                    dests = chess.BB_PAWN_ATTACKS[turn][squares[i]] & occupied & ~own
+                    push = squares[i] + step
+                    if not occupied & chess.BB_SQUARES[push]:
+                        dests |= chess.BB_SQUARES[push]
+                        start_rank = 1 if turn == chess.WHITE else 6
+                        if chess.square_rank(squares[i]) == start_rank and \
+                                not occupied & chess.BB_SQUARES[push + step]:
+                            dests |= chess.BB_SQUARES[push + step]
+                else:
+                    dests = _attacks(piece_type, color, squares[i], occupied) & ~own
+
+                for to_square in chess.scan_forward(dests):
+                    captured = -1
+                    for j in range(n):
+                        if squares[j] == to_square:
+                            captured = j
+                    new_squares = list(squares)
+                    new_squares[i] = to_square
+                    new_occupied = (occupied & ~from_bb) | chess.BB_SQUARES[to_square]
+                    king_square = to_square if i == kings[turn] else squares[kings[turn]]
+                    if _is_attacked(pieces, new_squares, king_square, not turn, new_occupied, skip=captured):
+                        continue
+
+                    promoting = piece_type == chess.PAWN and \
+                        chess.BB_SQUARES[to_square] & (chess.BB_RANK_1 | chess.BB_RANK_8)
+                    if captured < 0 and not promoting:
+                        count += 1
+                        continue
+
+                    # Exit into another table
+                    for promotion in (PROMOTIONS if promoting else (0,)):
+                        value = _child_value(pieces, new_squares, not turn, captured,
+                                             i if promoting else -1, promotion)
+                        if value is None or value == DRAW:
+                            count += 1000  # a draw is available, never a loss
+                        elif value >= LOSS:
+                            if value - LOSS < MAX_DISTANCE:
+                                exit_wins[value - LOSS + 1].append(index)
+                            count += 1000
+                        else:
+                            count += 1
+                            child_wins[value].append(index)
+
+            if count == 0:
+                if _is_attacked(pieces, squares, squares[kings[turn]], not turn, occupied):
+                    result[index] = LOSS
+                    resolved[0].append(index)
+            else:
+                remaining[index] = min(count, 0xFFFF)
+
+    for distance in range(MAX_DISTANCE + 1):
+        for index in child_wins[distance]:
+            remaining[index] -= 1
+            if remaining[index] == 0 and result[index] == DRAW and distance < MAX_DISTANCE:
+                result[index] = LOSS + distance + 1
+                resolved[distance + 1].append(index)
+
+        for index in exit_wins[distance]:
+            if result[index] == DRAW:
+                result[index] = distance
+                resolved[distance].append(index)
+
+        for index in resolved[distance]:
+            value = result[index]
+            turn = index < half  # side to move in this position
+            mover = not turn     # side that made the last move
+            base = index if turn else index - half
+            parent_offset = half if turn else -half
+
+            squares = [(base // stride[i]) % 64 for i in range(n)]
+            occupied = 0
+            for square in squares:
+                occupied |= chess.BB_SQUARES[square]
+
+            for i, (color, piece_type) in enumerate(pieces):
+                if color != mover:
+                    continue
+                square = squares[i]
+                if piece_type == chess.PAWN:
+                    step = 8 if mover == chess.WHITE else -8
+                    origins = 0
+                    back = square - step
+                    if 0 <= back < 64 and not occupied & chess.BB_SQUARES[back] and \
+                            not chess.BB_SQUARES[back] & (chess.BB_RANK_1 | chess.BB_RANK_8):
+                        origins |= chess.BB_SQUARES[back]
+                        double_rank = 3 if mover == chess.WHITE else 4
+                        if chess.square_rank(square) == double_rank and \
+                                not occupied & chess.BB_SQUARES[back - step]:
+                            origins |= chess.BB_SQUARES[back - step]
+                else:
+                    origins = _attacks(piece_type, color, square, occupied) & ~occupied
+
+                for origin in chess.scan_forward(origins):
+                    parent = index + parent_offset + (origin - square) * stride[i]
+                    if not legal[parent] or result[parent] != DRAW:
+                        continue
+                    if value >= LOSS:
+                        if distance < MAX_DISTANCE:
+                            result[parent] = distance + 1
+                            resolved[distance + 1].append(parent)
+                    else:
+                        remaining[parent] -= 1
+                        if remaining[parent] == 0 and distance < MAX_DISTANCE:
+                            result[parent] = LOSS + distance + 1
+                            resolved[distance + 1].append(parent)
+
+    return result
+
+
+def _dependencies(signature):
+    """Signatures reachable from this one by a capture or a promotion."""
+    white, black = signature.upper().split("V")
+    children = set()
+    for side, other, flip in ((white, black, False), (black, white, True)):
+        for k, symbol in enumerate(side):
+            if symbol == "K":
+                continue
+            rest = side[:k] + side[k + 1:]
+            captured = (other, rest) if flip else (rest, other)
+            children.add(captured)
+            if symbol == "P":
+                for promotion in "QRBN":
+                    promoted = side_string(PIECE_TYPES[s] for s in rest + promotion)
+                    children.add((other, promoted) if flip else (promoted, other))
+    normalized = set()
+    for w, b in children:
+        w, b = side_string(PIECE_TYPES[s] for s in w), side_string(PIECE_TYPES[s] for s in b)
+        child = f"{w}v{b}"
+        if not is_drawn_material(child):
+            normalized.add(child if (len(w), w) >= (len(b), b) else f"{b}v{w}")
+    return sorted(normalized)
+
+
+def build_tablebases(signatures=DEFAULT_SIGNATURES, directory=TABLEBASE_DIR, size_limit=SIZE_LIMIT):
+    """
+    Build and save tables for the given signatures (and anything they
+    convert into), skipping any that would push the total over size_limit.
+    """
+    os.makedirs(directory, exist_ok=True)
+    used = 0
+    built = []
+
+    def build(signature):
+        nonlocal used
+        if signature in TABLES:
+            return True
+        if len(signature) - 1 > MAX_PIECES:
+            print(f"Skipping {signature}: more than {MAX_PIECES} pieces")
+            return False
+        for child in _dependencies(signature):
+            if not build(child):
+                print(f"Skipping {signature}: missing {child}")
+                return False
+
+        path = table_path(signature, directory)
+        if os.path.exists(path) and os.path.getsize(path) == table_size(signature):
+            with open(path, "rb") as f:
+                TABLES[signature] = bytearray(f.read())
+            used += table_size(signature)
+            return True
+        if used + table_size(signature) > size_limit:
+            print(f"Skipping {signature}: would exceed {size_limit} bytes")
+            return False
+
+        print(f"Building {signature} tablebase...")
+        table = build_table(signature)
+        with open(path, "wb") as f:
+            f.write(table)
+        TABLES[signature] = table
+        used += len(table)
+        built.append(signature)
+        return True
+
+    for signature in signatures:
+        build(signature)
+    return built
+
+
+def load_tablebases(directory=TABLEBASE_DIR):
+    """Memory-map every table found in directory. Returns the loaded signatures."""
+    if not os.path.isdir(directory):
+        return []
+    for name in sorted(os.listdir(directory)):
+        signature, ext = os.path.splitext(name)
+        if ext != ".bin" or signature in TABLES:
+            continue
+        path = os.path.join(directory, name)
+        if os.path.getsize(path) != table_size(signature):
+            continue
+        with open(path, "rb") as f:
+            TABLES[signature] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return list(TABLES)
+
+
+def probe(board):
+    """
+    Look up a chess.Board in the loaded tables.
+    Returns the table byte for the side to move, or None if no table applies.
+    """
+    if not TABLES or chess.popcount(board.occupied) > MAX_PIECES:
+        return None
+    if board.castling_rights or board.has_legal_en_passant():
+        return None
+    piece_list = [(piece.color, piece.piece_type, square)
+                  for square, piece in board.piece_map().items()]
+    return _probe_pieces(piece_list, board.turn)
+
+
+def probe_score(board):
+    """
+    Tablebase score from WHITE's perspective for evaluate_board(),
+    or None if the position is not covered.
+    """
+    value = probe(board)
+    if value is None:
+        return None
+    if value == DRAW:
+        return 0
+    score = TB_WIN - value if value < LOSS else -(TB_WIN - (value - LOSS))
+    return score if board.turn == chess.WHITE else -score
+
+
+def best_move(board):
+    """
+    Pick the tablebase-optimal move: fastest win, otherwise a draw,
+    otherwise the longest resistance. Returns None if not covered.
+    """
+    if probe(board) is None:
+        return None
+
+    best = None
+    best_key = None
+    for move in board.legal_moves:
+        board.push(move)
+        if board.is_checkmate():
+            board.pop()
+            return move
+        if board.is_insufficient_material() or board.is_stalemate():
+            value = DRAW
+        else:
+            value = probe(board)
+        board.pop()
+        if value is None:
+            return None
+
+        # Lower key is better for the side to move
+        if value >= LOSS:
+            key = (0, value - LOSS)
+        elif value == DRAW:
+            key = (1, 0)
+        else:
+            key = (2, -value)
+        if best_key is None or key < best_key:
+            best, best_key = move, key
+    return best
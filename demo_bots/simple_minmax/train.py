@@ -1,12 +1,58 @@
+import random
+import chess
+from .tablebase import build_tablebases
+from . import positions
+from .repetition import PositionHistory
+from .play import search_position, repeats_position
+
+
+TRAIN_GAMES = 20     # self-play games searched into the position store
+TRAIN_DEPTH = 5      # one deeper than play() searches, so its probes hit
+RANDOM_PLIES = 6     # random opening moves so the games differ
+MAX_PLIES = 160
+
+
+def self_play(games=TRAIN_GAMES, depth=TRAIN_DEPTH, seed=None, directory=positions.STORE_DIR):
+    """
+    Play games against itself and save every searched position's score
+    and best move in the position store. The store is written after each
+    game, so an interrupted run keeps what it finished.
+    """
+    rng = random.Random(seed)
+    positions.load_store(directory)
+    for game in range(games):
+        board = chess.Board()
+        for _ in range(RANDOM_PLIES):
+            board.push(rng.choice(list(board.legal_moves)))
+        history = PositionHistory(board)
+
+        entries = {}
+        while not board.is_game_over(claim_draw=True) and board.ply() < MAX_PLIES:
+            # Search from a history holding only this position, so no line
+            # scores as a repetition of the game so far: the stored score
+            # and move then belong to the position, whatever led to it
+            root = PositionHistory(board)
+            stored = positions.probe(root.key)
+            if stored is not None and stored[1] >= depth and stored[2] is not None and \
+                    stored[2] in board.legal_moves:
+                move = stored[2]
+            else:
+                score, move = search_position(board, depth, root)
+                entries[root.key] = (score, depth, move)
+            # That move ignores the game so far; if it goes back to one of
+            # its positions, choose the move played with the game's history
+            # so the game moves on instead of shuffling into a repetition
+            if repeats_position(board, history, move):
+                move = search_position(board, depth, history)[1]
+            history.push(board, move)
+
+        written = positions.write_entries(entries, directory)
+        print(f"Self-play game {game + 1}/{games}: {board.result(claim_draw=True)}, "
+              f"{written} positions stored")
+
+
 def train():
-    pass
-
-# This is just a placeholder
-# Your implementation of the chess bot
-# may or may not require a training script
-# in any case, train() should be implemented if you
-# are using the __main__.py which was provided,
-# or your bot must otherwise gracefully handle the "train"
-# command line option to avoid running into errors as we
-# systematically run each bot with the "train" option
-# prior to the tourney
\ No newline at end of file
+    # Solve small endings ahead of time so play() can look them up
+    # instead of searching them (see tablebase.py)
+    build_tablebases()
+    self_play()
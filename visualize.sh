@@ -5,8 +5,8 @@
 set -e
 
 # Check arguments
-if [ "$#" -ne 2 ]; then
-    echo "Usage: $0 /path/to/bot1 /path/to/bot2"
+if [ "$#" -lt 2 ]; then
+    echo "Usage: $0 /path/to/bot1 /path/to/bot2 [--fen FEN | --moves MOVES | --opening]"
     exit 1
 fi
 
@@ -14,4 +14,4 @@ BOT1="${1%/}"
 BOT2="${2%/}"
 
 # Run the competition and visualization
-python -m competition_moderator "$BOT1" "$BOT2" | python visualizer.py "$BOT1" "$BOT2"
+python -m competition_moderator "$BOT1" "$BOT2" "${@:3}" | python visualizer.py "$BOT1" "$BOT2"